@@ -1,7 +1,8 @@
 from abc import ABC
 from functools import cached_property
-from typing import Tuple
+from typing import Dict, Tuple
 
+import numpy as np
 import pandas as pd
 
 from kaogexp.data.loader import ColunaYSingleton
@@ -43,6 +44,8 @@ class DatasetAbstract(ABC):
         :type tratador: str
         """
 
+        # Visões já calculadas do dataset, descartadas sempre que `_dataset` é substituído
+        self._visoes: Dict[Tuple, pd.DataFrame] = {}
         self._dataset = self._strip_dataset(data)
         self._nomes_colunas_categoricas = colunas_categoricas
         self._atribuir_colunas_categoricas()
@@ -65,6 +68,28 @@ class DatasetAbstract(ABC):
         nomes_cols_num = x.drop(self._nomes_colunas_categoricas, axis=1).columns
         self._normalizador: NormalizerAbstract = self._get_nomalizer(nomes_cols_num, normalizador, x)
 
+    @property
+    def _dataset(self) -> pd.DataFrame:
+        return self._dados
+
+    @_dataset.setter
+    def _dataset(self, dados: pd.DataFrame) -> None:
+        self._dados = dados
+        self.clear_cache()
+
+    def clear_cache(self) -> None:
+        """
+        Descarta as visões em cache. Deve ser chamado sempre que `_dataset` for alterado no lugar, pois apenas a
+        substituição de `_dataset` é detectada automaticamente.
+        """
+        self._visoes.clear()
+
+    def __getstate__(self):
+        # As visões são recalculadas quando necessário, evitando serializar cópias do dataset
+        state = self.__dict__.copy()
+        state['_visoes'] = {}
+        return state
+
     def _get_tratador(self, tratador):
         if isinstance(tratador, str):
             return TreatmentFactory.create(tratador, dataset=self._dataset)
@@ -78,9 +103,14 @@ class DatasetAbstract(ABC):
                                             nomes_colunas_normalizar=nomes_cols_num)
         return normalizador
 
-    def dataset(self, normalizado: bool = True, encoded: bool = False, factorized: bool = False) -> pd.DataFrame:
+    def dataset(self, normalizado: bool = True, encoded: bool = False, factorized: bool = False,
+                copia: bool = False) -> pd.DataFrame:
         """
-        Retorna o dataset normalizado e/ou codificado
+        Retorna o dataset normalizado e/ou codificado.
+        Cada combinação de parâmetros é calculada apenas uma vez e mantida em cache até que `_dataset` seja
+        substituído ou `clear_cache` seja chamado. Por padrão é retornado o próprio frame em cache, compartilhado entre
+        as chamadas, cujos valores são somente leitura. Quem chama não deve alterá-lo, nem adicionar ou remover colunas,
+        e deve usar `copia` ou `pd.DataFrame.copy` para obter um frame que possa ser alterado.
 
         :param normalizado: Se o dataset deve ser normalizado
         :type normalizado: bool
@@ -89,11 +119,47 @@ class DatasetAbstract(ABC):
         :param factorized: Se o dataset deve ter as colunas categóricas transformadas em código numérico.
         Não pode ser usado em conjunto com `encoded`.
         :type factorized: bool
+        :param copia: Se True, é retornada uma cópia, que pode ser alterada sem afetar o cache.
+        :type copia: bool
         :return: O dataset normalizado e/ou codificado e/ou factorized.
         :rtype: pd.DataFrame
         """
-        dataset = self._dataset.copy()
+        visao = self._visao(normalizado, encoded, factorized, com_y=True)
+        return visao.copy() if copia else visao
+
+    def _visao(self, normalizado: bool, encoded: bool, factorized: bool, com_y: bool) -> pd.DataFrame:
+        """
+        Visão em cache do dataset, com ou sem `NOME_COLUNA_Y`. Os seus valores são marcados como somente leitura, pois
+        ela é compartilhada entre as chamadas.
+        """
         self._validate_parameters(encoded, factorized)
+        nome_y = ColunaYSingleton().NOME_COLUNA_Y
+        chave = (normalizado, encoded, factorized, com_y, nome_y)
+        if chave not in self._visoes:
+            if not com_y:
+                visao = self._visao(normalizado, encoded, factorized, com_y=True).drop(nome_y, axis=1)
+            else:
+                visao = self._calcular_dataset(normalizado, encoded, factorized)
+            self._visoes[chave] = self._somente_leitura(visao)
+        return self._visoes[chave]
+
+    @staticmethod
+    def _somente_leitura(dados: pd.DataFrame) -> pd.DataFrame:
+        """
+        Marca como somente leitura os arrays que armazenam os valores de `dados`, de forma que qualquer atribuição aos
+        seus valores gere um `ValueError`. Os blocos são consolidados antes, para que o pandas não os substitua depois
+        por arrays que podem ser alterados.
+        """
+        dados._consolidate_inplace()
+        for valores in dados._mgr.arrays:
+            # Arrays do pandas, como `pd.Categorical`, guardam os valores em arrays do NumPy internos
+            for array in (valores, *(getattr(valores, nome, None) for nome in ('_ndarray', '_data', '_mask'))):
+                if isinstance(array, np.ndarray):
+                    array.setflags(write=False)
+        return dados
+
+    def _calcular_dataset(self, normalizado: bool, encoded: bool, factorized: bool) -> pd.DataFrame:
+        dataset = self._dataset.copy()
         if normalizado:
             ds_normalizado = self._normalizador.transform(dataset.drop(ColunaYSingleton().NOME_COLUNA_Y, axis=1))
             dataset = ds_normalizado.join(dataset[ColunaYSingleton().NOME_COLUNA_Y])
@@ -125,11 +191,12 @@ class DatasetAbstract(ABC):
     @cached_property
     def nomes_colunas_numericas(self) -> pd.Index:
         """Definidas como as colunas que são são a `NOME_COLUNA_Y` ou colunas categóricas."""
-        return self.x(False).drop(self.nomes_colunas_categoricas, axis=1).copy().columns
+        return self._visao(False, False, False, com_y=False).columns.drop(self.nomes_colunas_categoricas)
 
-    def x(self, normalizado: bool = True, encoded: bool = False, factorized: bool = False) -> pd.DataFrame:
+    def x(self, normalizado: bool = True, encoded: bool = False, factorized: bool = False,
+          copia: bool = False) -> pd.DataFrame:
         """
-        Retorna o dataset sem `NOME_COLUNA_Y`.
+        Retorna o dataset sem `NOME_COLUNA_Y`, mantido em cache da mesma forma que em `dataset`.
 
         :param normalizado: Se x deven ser normalizado.
         :type normalizado: bool
@@ -138,13 +205,17 @@ class DatasetAbstract(ABC):
         :param factorized: Se o dataset deve ter as colunas categóricas transformadas em código numérico.
         Não pode ser usado em conjunto com `encoded`.
         :type factorized: bool
+        :param copia: Se True, é retornada uma cópia, que pode ser alterada sem afetar o cache. Caso contrário, o frame
+        em cache é somente leitura, como em `dataset`.
+        :type copia: bool
         :return: O dataset sem `NOME_COLUNA_Y`.
         """
-        return self.dataset(normalizado, encoded, factorized).drop(ColunaYSingleton().NOME_COLUNA_Y, axis=1)
+        visao = self._visao(normalizado, encoded, factorized, com_y=False)
+        return visao.copy() if copia else visao
 
     def y(self) -> pd.Series:
         """Apenas `NOME_COLUNA_Y` do dataset."""
-        return self.dataset(False)[ColunaYSingleton().NOME_COLUNA_Y].copy()
+        return self._dataset[ColunaYSingleton().NOME_COLUNA_Y].copy()
 
     @staticmethod
     def _strip_dataset(dataset: pd.DataFrame) -> pd.DataFrame:
@@ -160,3 +231,4 @@ class DatasetAbstract(ABC):
         """Define as colunas necessárias com o tipo adequado de categórico do Pandas."""
         colunas_categoricas = self._nomes_colunas_categoricas
         self._dataset[colunas_categoricas] = self._dataset[colunas_categoricas].astype("category")
+        self.clear_cache()
@@ -1,5 +1,6 @@
-from typing import Union
+from typing import Dict, Tuple, Union
 
+import numpy as np
 import pandas as pd
 from sklearn.preprocessing import MinMaxScaler
 
@@ -7,16 +8,40 @@ from kaogexp.data.normalizer.NormalizerAbstract import NormalizerAbstract
 
 
 class MinMaxNormalizer(NormalizerAbstract):
-    normalizer = MinMaxScaler()
+    """
+    Normalização min-max das colunas numéricas.
+    Cada normalizador guarda os seus próprios parâmetros, ajustados na criação e somente leitura, de forma que vários
+    conjuntos de dados podem ser normalizados no mesmo processo, inclusive simultaneamente.
+    """
 
     def __init__(self, x: pd.DataFrame, nomes_colunas_normalizar: pd.Index):
         super().__init__(nomes_colunas_normalizar)
-        self._data = x
-        self.normalizer.fit(x.loc[:, self.nomes_colunas_normalizar])
+        ajuste = MinMaxScaler().fit(x.loc[:, self.nomes_colunas_normalizar])
+        # Parâmetros do ajuste, aplicados diretamente com NumPy, sem as validações do sklearn a cada chamada
+        self._escala = self._somente_leitura(ajuste.scale_)
+        self._minimo = self._somente_leitura(ajuste.min_)
+        # Posições das colunas a normalizar para cada index de `pd.Series` já recebido
+        self._posicoes: Dict[Tuple, np.ndarray] = {}
+
+    @staticmethod
+    def _somente_leitura(valores: np.ndarray) -> np.ndarray:
+        valores = np.array(valores, dtype=float)
+        valores.setflags(write=False)
+        return valores
+
+    @property
+    def escala(self) -> np.ndarray:
+        """Fator aplicado a cada coluna normalizada, na ordem de `nomes_colunas_normalizar`."""
+        return self._escala
+
+    @property
+    def minimo(self) -> np.ndarray:
+        """Deslocamento aplicado a cada coluna normalizada após a escala, na ordem de `nomes_colunas_normalizar`."""
+        return self._minimo
 
     def transform(self, instancia: Union[pd.Series, pd.DataFrame]) -> Union[pd.Series, pd.DataFrame]:
         """
-        Normaliza uma instância utilizando o normalizer, já preparado nesta classe.
+        Normaliza uma instância utilizando os parâmetros ajustados na criação do normalizador.
 
         :param instancia: Instância a ser normalizada, representando uma linha do conjunto de dados.
         :type instancia: Union[pd.Series, pd.DataFrame]
@@ -24,14 +49,7 @@ class MinMaxNormalizer(NormalizerAbstract):
         :rtype: Union[pd.Series, pd.DataFrame]
         :raise: ValueError: Se o tipo de `instancia` não for um pd.Series ou pd.DataFrame.
         """
-        instancia = instancia.copy()
-        if isinstance(instancia, pd.Series):
-            return self.transform(pd.DataFrame([instancia])).iloc[0]
-
-        elif isinstance(instancia, pd.DataFrame):
-            instancia[self.nomes_colunas_normalizar] = self.normalizer.transform(
-                instancia[self.nomes_colunas_normalizar])
-        return instancia
+        return self._aplicar(instancia, lambda valores: valores * self._escala + self._minimo)
 
     def inverse_transform(self, instancia: Union[pd.Series, pd.DataFrame]) -> Union[pd.Series, pd.DataFrame]:
         """
@@ -43,10 +61,32 @@ class MinMaxNormalizer(NormalizerAbstract):
         :return: Instância revertida, contendo valores condizentes com os dados originais.
         :rtype: Union[pd.Series, pd.DataFrame]
         """
-        instancia = instancia.copy()
+        return self._aplicar(instancia, lambda valores: (valores - self._minimo) / self._escala)
+
+    def _aplicar(self, instancia: Union[pd.Series, pd.DataFrame], funcao) -> Union[pd.Series, pd.DataFrame]:
+        """
+        Aplica `funcao` aos valores das colunas a normalizar, sem alterar `instancia`.
+        Uma `pd.Series` é tratada diretamente como um array, sem ser convertida em um `pd.DataFrame`.
+        """
         if isinstance(instancia, pd.Series):
-            return self.inverse_transform(pd.DataFrame([instancia])).iloc[0]
-        elif isinstance(instancia, pd.DataFrame):
-            instancia[self.nomes_colunas_normalizar] = self.normalizer.inverse_transform(
-                instancia[self.nomes_colunas_normalizar])
+            posicoes = self._posicoes_series(instancia.index)
+            valores = instancia.to_numpy(copy=True)
+            if valores.dtype.kind in 'biu':
+                valores = valores.astype(float)
+            valores[posicoes] = funcao(valores[posicoes].astype(float))
+            return pd.Series(valores, index=instancia.index, name=instancia.name)
+
+        instancia = instancia.copy()
+        if isinstance(instancia, pd.DataFrame):
+            instancia[self.nomes_colunas_normalizar] = funcao(
+                instancia[self.nomes_colunas_normalizar].to_numpy(dtype=float))
         return instancia
+
+    def _posicoes_series(self, index: pd.Index) -> np.ndarray:
+        chave = tuple(index)
+        if chave not in self._posicoes:
+            posicoes = index.get_indexer(self.nomes_colunas_normalizar)
+            if (posicoes < 0).any():
+                raise KeyError(f'{list(self.nomes_colunas_normalizar[posicoes < 0])} not in index')
+            self._posicoes[chave] = posicoes
+        return self._posicoes[chave]
@@ -0,0 +1,42 @@
+from abc import ABC, abstractmethod
+from typing import Optional, Union
+
+import numpy as np
+
+
+class EscalonadorEpsilonAbstract(ABC):
+    """
+    Define como o epsilon de um sampler cresce enquanto a amostragem não contém a classe desejada e, depois que ela
+    for encontrada, como o epsilon pode ser refinado de volta ao menor valor que ainda a contém.
+    """
+
+    @abstractmethod
+    def proximo(self, epsilon: Union[float, np.ndarray], limite: float) -> Union[float, np.ndarray]:
+        """
+        Calcula o epsilon seguinte a `epsilon`.
+
+        :param epsilon: Epsilon atual.
+        :type epsilon: Union[float, np.ndarray]
+        :param limite: Valor máximo do epsilon.
+        :type limite: float
+        :return: Próximo epsilon.
+        :rtype: Union[float, np.ndarray]
+        :raise ValueError: Se não for possível aumentar o epsilon sem ultrapassar `limite`.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def refinar(self, inferior: Union[float, np.ndarray],
+                superior: Union[float, np.ndarray]) -> Optional[Union[float, np.ndarray]]:
+        """
+        Calcula o próximo epsilon a ser testado entre o maior epsilon conhecido sem a classe desejada e o menor
+        epsilon conhecido com ela.
+
+        :param inferior: Maior epsilon cuja amostragem não contém a classe desejada.
+        :type inferior: Union[float, np.ndarray]
+        :param superior: Menor epsilon cuja amostragem contém a classe desejada.
+        :type superior: Union[float, np.ndarray]
+        :return: Epsilon a ser testado, ou None se o refinamento terminou.
+        :rtype: Optional[Union[float, np.ndarray]]
+        """
+        raise NotImplementedError
@@ -0,0 +1,49 @@
+from typing import Optional, Union
+
+import numpy as np
+
+from kaogexp.data.sampler.EscalonadorEpsilonAbstract import EscalonadorEpsilonAbstract
+
+
+class EscalonadorGeometrico(EscalonadorEpsilonAbstract):
+    """
+    Multiplica o epsilon por `fator` até que a amostragem contenha a classe desejada e depois realiza uma bisseção
+    entre o último epsilon inválido e o primeiro válido, até que a distância entre eles seja no máximo `tolerancia`.
+    Um epsilon único cresce para pelo menos `epsilon_minimo`, de forma que um epsilon inicial 0 também possa crescer.
+    Em um array de epsilons, assim como no incremento linear do `LatinSampler`, as features com epsilon 0 não crescem.
+    """
+
+    def __init__(self, fator: float = 2., tolerancia: float = .025, epsilon_minimo: float = .025):
+        """
+        :param fator: Fator de crescimento do epsilon. Deve ser maior que 1.
+        :type fator: float
+        :param tolerancia: Distância máxima entre os limites da bisseção para encerrá-la. Utilize um valor maior ou
+        igual ao limite do epsilon para não realizar a bisseção.
+        :type tolerancia: float
+        :param epsilon_minimo: Menor valor de um epsilon único após o crescimento. Deve ser maior que 0.
+        :type epsilon_minimo: float
+        """
+        if fator <= 1:
+            raise ValueError("Fator must be greater than 1")
+        if tolerancia <= 0:
+            raise ValueError("Tolerancia must be greater than 0")
+        if epsilon_minimo <= 0:
+            raise ValueError("Epsilon minimo must be greater than 0")
+        self.fator = fator
+        self.tolerancia = tolerancia
+        self.epsilon_minimo = epsilon_minimo
+
+    def proximo(self, epsilon: Union[float, np.ndarray], limite: float) -> Union[float, np.ndarray]:
+        proximo = np.asarray(epsilon) * self.fator
+        if proximo.ndim == 0:
+            proximo = np.maximum(proximo, self.epsilon_minimo)
+        proximo = np.minimum(proximo, limite)
+        if np.array_equal(np.round(proximo, 6), np.round(epsilon, 6)):
+            raise ValueError("Epsilon value cannot be greater than {}".format(limite))
+        return proximo if isinstance(epsilon, np.ndarray) else float(proximo)
+
+    def refinar(self, inferior: Union[float, np.ndarray],
+                superior: Union[float, np.ndarray]) -> Optional[Union[float, np.ndarray]]:
+        if np.round(np.max(np.abs(np.asarray(superior) - inferior)), 6) <= self.tolerancia:
+            return None
+        return (inferior + superior) / 2
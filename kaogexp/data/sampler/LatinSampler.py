@@ -1,22 +1,47 @@
+import threading
 import warnings
+from collections import OrderedDict
 from random import randint
-from typing import Union
+from typing import Optional, Tuple, Union
 
 import lhsmdu as lhsmdu
 import numpy as np
 import pandas as pd
 
 from kaogexp.data.loader import ColunaYSingleton
+from kaogexp.data.sampler.EscalonadorEpsilonAbstract import EscalonadorEpsilonAbstract
 from kaogexp.data.sampler.SamplerAbstract import SamplerAbstract
 
+# lhsmdu keeps its state in module globals and in the global `numpy.random` generator
+_LHSMDU_LOCK = threading.Lock()
+
 
 class LatinSampler(SamplerAbstract):
     """
-    Latin Sampler is a sampler that samples from a Latin hypercube using `lhsmdu` method.
+    Latin Sampler is a sampler that samples from a Latin hypercube.
+
+    The hypercube can be generated by the `lhsmdu` method (default) or by the much faster built-in vectorized generator.
+    Both generate valid Latin hypercubes, but not the same ones.
+
+    Without a `gerador` in `realizar_amostragem`, `lhsmdu` is used as in earlier versions: it is seeded with `seed` when
+    the sampler is created and every sampling continues its stream, so those hypercubes are the same as before. With a
+    `gerador`, as passed by `KAOGExp` for each explanation, `lhsmdu` is reseeded on every call with a seed drawn from
+    it, which makes each explanation reproducible on its own, but gives different hypercubes than earlier versions.
+
+    `lhsmdu` keeps its state in module globals and reseeds the global `numpy.random` generator, so its calls are
+    serialized behind a module lock. Its hypercubes are reproducible only while no other code in the process draws from
+    `numpy.random` concurrently, which is guaranteed only when explanations run in separate processes.
+
+    With the cache enabled, each hypercube depends only on its shape and on `seed`, so the `gerador` passed to
+    `realizar_amostragem` is ignored and all explanations share the same hypercubes.
     """
+    GERADOR_VETORIZADO = 'vetorizado'
+    GERADOR_LHSMDU = 'lhsmdu'
+    GERADORES = (GERADOR_VETORIZADO, GERADOR_LHSMDU)
 
     def __init__(self, epsilon: Union[float, np.ndarray], incremento: float = 0.05, limite_epsilon: float = 1.0,
-                 seed: int = None):
+                 seed: int = None, gerador: str = GERADOR_LHSMDU, iteracoes_maximin: int = 0,
+                 tamanho_cache: int = 0, escalonador: Optional[EscalonadorEpsilonAbstract] = None):
         """
         Initializes the Latin Sampler.
 
@@ -25,9 +50,29 @@ class LatinSampler(SamplerAbstract):
         :type epsilon: Union[float, np.ndarray]
         :param incremento: Represents the increment of the sampling in each feature.
         :type incremento: float
-        :param seed: Seed to be used in the `lhsmdu`.
+        :param seed: Seed used to generate the Latin hypercubes.
         :type seed: int
+        :param gerador: Latin hypercube generator, one of `GERADORES`. The vectorized generator stratifies each
+         feature with a random permutation, while `lhsmdu` uses its (much slower) distance-based elimination.
+        :type gerador: str
+        :param iteracoes_maximin: Maximum number of coordinate exchanges used to improve the minimum distance between
+         samples of the vectorized generator. Use 0 to disable the refinement.
+        :type iteracoes_maximin: int
+        :param tamanho_cache: Maximum number of unit hypercubes kept in a LRU cache keyed by (dim, num_samples, seed).
+         With the cache enabled, repeated samplings with the same shape reuse the same hypercube, only rescaled to the
+         requested epsilon and point of interest, and the generator passed to `realizar_amostragem` is not used. Use 0
+         to disable the cache, so every sampling draws a new hypercube.
+        :type tamanho_cache: int
+        :param escalonador: Schedule used to increase and refine epsilon. If None, epsilon grows linearly by
+         `incremento` and is never refined.
+        :type escalonador: Optional[EscalonadorEpsilonAbstract]
         """
+        if gerador not in self.GERADORES:
+            raise ValueError("Generator must be one of {}".format(self.GERADORES))
+        if iteracoes_maximin < 0:
+            raise ValueError("Maximin iterations must not be negative")
+        if tamanho_cache < 0:
+            raise ValueError("Cache size must not be negative")
         self.incremento = incremento
         self._initial_epsilon = epsilon
         self._limite_epsilon = limite_epsilon
@@ -35,12 +80,36 @@ class LatinSampler(SamplerAbstract):
         if seed is None:
             seed = randint(0, (2 ** 32) - 1)
         self.seed = seed
-        lhsmdu.setRandomSeed(seed)
+        self.gerador = gerador
+        if gerador == self.GERADOR_LHSMDU:
+            with _LHSMDU_LOCK:
+                lhsmdu.setRandomSeed(seed)
+        self.escalonador = escalonador
+        self.iteracoes_maximin = iteracoes_maximin
+        self._rng = np.random.default_rng(seed)
+        self.tamanho_cache = tamanho_cache
+        self._cache: OrderedDict = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_cache_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._cache_lock = threading.Lock()
 
     @property
     def epsilon(self) -> float:
         return round(self._epsilon, 6)
 
+    @property
+    def epsilon_inicial(self) -> Union[float, np.ndarray]:
+        return self._initial_epsilon
+
     @property
     def fixed_cols(self) -> pd.Index:
         if hasattr(self, '_fixed_cols') and self._fixed_cols is not None:
@@ -51,7 +120,9 @@ class LatinSampler(SamplerAbstract):
     def fixed_cols(self, fixed_cols: pd.Index):
         self._fixed_cols = fixed_cols.copy() if fixed_cols is not None else None
 
-    def realizar_amostragem(self, interest_point: pd.Series, num_samples: int) -> pd.DataFrame:
+    def realizar_amostragem(self, interest_point: pd.Series, num_samples: int,
+                            epsilon: Union[float, np.ndarray, None] = None,
+                            gerador: Optional[np.random.Generator] = None) -> pd.DataFrame:
         """
         Realizes a Latin Hypercube Sampling around 'interest_point' with 'num_samples' samples.
         **Only numerical columns are considered.**
@@ -60,37 +131,205 @@ class LatinSampler(SamplerAbstract):
         :type interest_point: pd.Series
         :param num_samples: Number of samples to be generated.
         :type num_samples: int
+        :param epsilon: Limit of the sampling to be used instead of the sampler's own epsilon. Allows the caller to keep
+         the epsilon state, so the same sampler can be shared by concurrent explanations.
+        :type epsilon: Union[float, np.ndarray, None]
+        :param gerador: Random generator to be used instead of the sampler's own one, so that each explanation can own
+         an independent, reproducible stream. It is ignored when the cache is enabled, since cached hypercubes depend
+         only on their shape and on `seed`.
+        :type gerador: Optional[np.random.Generator]
         :return: DataFrame with samples. Each row is a sample.
         :rtype: pd.DataFrame
         """
+        epsilon = round(self._epsilon if epsilon is None else epsilon, 6)
         # Prepara os dados
         interest_point = interest_point.copy().drop(ColunaYSingleton().NOME_COLUNA_Y, errors='ignore')
         interest_point_np = self._sanitize(interest_point).to_numpy().astype(float)
 
         # Calcula a amostra e os valores para realizar a transformação
-        with warnings.catch_warnings():
-            warnings.filterwarnings('ignore', category=PendingDeprecationWarning)
-            latin_sample = np.array(lhsmdu.sample(interest_point_np.shape[0], num_samples, randomSeed=self.seed))
-        data_frame = self._prepare_sample(interest_point, interest_point_np, latin_sample, num_samples)
+        if gerador is None or self.tamanho_cache > 0:
+            latin_sample = self._unit_design(interest_point_np.shape[0], num_samples)
+        else:
+            latin_sample = self._latin_hypercube(interest_point_np.shape[0], num_samples, gerador)
+        data_frame = self._prepare_sample(interest_point, interest_point_np, latin_sample, num_samples, epsilon)
         return data_frame
 
+    def clear_cache(self) -> None:
+        """Removes all hypercubes from the cache and resets its counters."""
+        with self._cache_lock:
+            self._cache.clear()
+            self.cache_hits = 0
+            self.cache_misses = 0
+
+    def _unit_design(self, dim: int, num_samples: int) -> np.ndarray:
+        """
+        Gets the unit hypercube for the sampling, from the cache when it is enabled.
+
+        :param dim: Number of features.
+        :type dim: int
+        :param num_samples: Number of samples.
+        :type num_samples: int
+        :return: Read-only array with shape (num_samples, dim), with values in [0, 1].
+        :rtype: np.ndarray
+        """
+        if self.tamanho_cache == 0:
+            return self._latin_hypercube(dim, num_samples)
+        key: Tuple[int, int, int] = (dim, num_samples, self.seed)
+        with self._cache_lock:
+            design = self._cache.get(key)
+            if design is not None:
+                self._cache.move_to_end(key)
+                self.cache_hits += 1
+                return design
+            self.cache_misses += 1
+            # Generated from the key itself, so the cached design does not depend on which call filled the cache
+            design = self._latin_hypercube(dim, num_samples, np.random.default_rng([self.seed, dim, num_samples]))
+            design.setflags(write=False)
+            self._cache[key] = design
+            if len(self._cache) > self.tamanho_cache:
+                self._cache.popitem(last=False)
+            return design
+
+    def _latin_hypercube(self, dim: int, num_samples: int, rng: Optional[np.random.Generator] = None) -> np.ndarray:
+        """
+        Generates a Latin hypercube in the unit space using the generator chosen for the sampler.
+
+        :param dim: Number of features.
+        :type dim: int
+        :param num_samples: Number of samples.
+        :type num_samples: int
+        :param rng: Random generator. If None, the sampler's own generator is used, or, for `lhsmdu`, its stream
+         seeded when the sampler was created.
+        :type rng: Optional[np.random.Generator]
+        :return: Array with shape (num_samples, dim), with values in [0, 1].
+        :rtype: np.ndarray
+        """
+        if self.gerador == self.GERADOR_LHSMDU:
+            with _LHSMDU_LOCK, warnings.catch_warnings():
+                warnings.filterwarnings('ignore', category=PendingDeprecationWarning)
+                if rng is None:
+                    # Same call as earlier versions, continuing the stream seeded when the sampler was created
+                    return np.array(lhsmdu.sample(dim, num_samples, randomSeed=self.seed)).T
+                # lhsmdu only accepts a seed, drawn from `rng`. `sample` only reseeds when the seed differs from the
+                # last one set, so it is always set here
+                seed = int(rng.integers(2 ** 32 - 1))
+                lhsmdu.setRandomSeed(seed)
+                return np.array(lhsmdu.sample(dim, num_samples, randomSeed=seed)).T
+        rng = self._rng if rng is None else rng
+        design = self._stratified_design(rng, dim, num_samples)
+        if self.iteracoes_maximin > 0:
+            design = self._maximin(rng, design, self.iteracoes_maximin)
+        return design
+
+    @staticmethod
+    def _stratified_design(rng: np.random.Generator, dim: int, num_samples: int) -> np.ndarray:
+        """
+        Vectorized Latin hypercube: each feature is split in `num_samples` strata, a random permutation assigns one
+        stratum to each sample and the value is drawn uniformly inside it.
+
+        :param rng: Random number generator.
+        :type rng: np.random.Generator
+        :param dim: Number of features.
+        :type dim: int
+        :param num_samples: Number of samples.
+        :type num_samples: int
+        :return: Array with shape (num_samples, dim), with values in [0, 1].
+        :rtype: np.ndarray
+        """
+        strata = rng.random((num_samples, dim)).argsort(axis=0)
+        return (strata + rng.random((num_samples, dim))) / num_samples
+
+    @staticmethod
+    def _maximin(rng: np.random.Generator, design: np.ndarray, iterations: int) -> np.ndarray:
+        """
+        Improves the minimum distance between the samples of `design`. In each iteration one coordinate of a sample
+        from the closest pair is exchanged with the same coordinate of another random sample, which keeps the Latin
+        hypercube property. The exchange is kept only if the minimum distance does not decrease.
+
+        :param rng: Random number generator.
+        :type rng: np.random.Generator
+        :param design: Latin hypercube with shape (num_samples, dim).
+        :type design: np.ndarray
+        :param iterations: Maximum number of exchanges evaluated.
+        :type iterations: int
+        :return: Refined Latin hypercube.
+        :rtype: np.ndarray
+        """
+        num_samples, dim = design.shape
+        if num_samples < 3:
+            return design
+        design = design.copy()
+        distances = np.sqrt(((design[:, np.newaxis, :] - design[np.newaxis, :, :]) ** 2).sum(axis=2))
+        np.fill_diagonal(distances, np.inf)
+        for _ in range(iterations):
+            current = distances.min()
+            i = np.unravel_index(distances.argmin(), distances.shape)[rng.integers(2)]
+            k = rng.integers(num_samples - 1)
+            k += k >= i
+            col = rng.integers(dim)
+            old_rows = distances[[i, k]].copy()
+            design[[i, k], col] = design[[k, i], col]
+            new_rows = np.sqrt(((design[[i, k], np.newaxis, :] - design[np.newaxis, :, :]) ** 2).sum(axis=2))
+            new_rows[0, i] = new_rows[1, k] = np.inf
+            distances[[i, k]] = new_rows
+            distances[:, [i, k]] = new_rows.T
+            if distances.min() < current:
+                # Desfaz a troca
+                design[[i, k], col] = design[[k, i], col]
+                distances[[i, k]] = old_rows
+                distances[:, [i, k]] = old_rows.T
+        return design
+
+    def proximo_epsilon(self, epsilon: Union[float, np.ndarray]) -> Union[float, np.ndarray]:
+        """
+        Computes the epsilon that follows `epsilon`, without changing the state of the sampler.
+
+        :param epsilon: Current epsilon.
+        :type epsilon: Union[float, np.ndarray]
+        :return: Increased epsilon.
+        :rtype: Union[float, np.ndarray]
+        :raise ValueError: If the increased epsilon would be greater than `limite_epsilon`.
+        """
+        if self.escalonador is not None:
+            return self.escalonador.proximo(epsilon, self._limite_epsilon)
+        if (round(epsilon, 6) + self.incremento) > self._limite_epsilon:
+            raise ValueError("Epsilon value cannot be greater than {}".format(self._limite_epsilon))
+        if isinstance(epsilon, np.ndarray):
+            mask = epsilon.copy()
+            mask[mask != 0] = self.incremento
+            return epsilon + mask
+        return epsilon + self.incremento
+
+    def refinar_epsilon(self, inferior: Union[float, np.ndarray],
+                        superior: Union[float, np.ndarray]) -> Optional[Union[float, np.ndarray]]:
+        """
+        Computes the next epsilon to be tried between an epsilon whose sampling did not contain the desired class and
+        one whose sampling did.
+
+        :param inferior: Greatest epsilon known to be invalid.
+        :type inferior: Union[float, np.ndarray]
+        :param superior: Smallest epsilon known to be valid.
+        :type superior: Union[float, np.ndarray]
+        :return: Epsilon to be tried, or None if there is nothing to refine.
+        :rtype: Optional[Union[float, np.ndarray]]
+        """
+        if self.escalonador is None:
+            return None
+        return self.escalonador.refinar(inferior, superior)
+
     def increase_epsilon(self) -> None:
         """Used to increase the epsilon value."""
-        if (self.epsilon + self.incremento) > self._limite_epsilon:
+        try:
+            self._epsilon = self.proximo_epsilon(self._epsilon)
+        except ValueError:
             self.reset_epsilon()
-            raise ValueError("Epsilon value cannot be greater than {}".format(self._limite_epsilon))
-        if isinstance(self.epsilon, float):
-            self._epsilon += self.incremento
-        else:
-            mask = self.epsilon.copy()
-            mask[mask != 0] = self.incremento
-            self._epsilon += mask
+            raise
 
     def reset_epsilon(self) -> None:
         """Retorna o epsilon para o valor inicial."""
         self._epsilon = self._initial_epsilon
 
-    def _prepare_sample(self, interest_point, interest_point_np, latin_sample, num_samples):
+    def _prepare_sample(self, interest_point, interest_point_np, latin_sample, num_samples, epsilon):
         """
         Com base nos dados de `interest_point` e `interest_point_np`, coloca o amostra no intervalo desejado, além de
         colocar os valores de index, de forma que o primeiro valor seja o do ponto de interesse.
@@ -99,19 +338,21 @@ class LatinSampler(SamplerAbstract):
         :type interest_point: pd.Series
         :param interest_point_np: Ponto de interesse em formato numpy.
         :type interest_point_np: np.ndarray
-        :param latin_sample: Amostra gerada pelo lhsmdu.
+        :param latin_sample: Hipercubo latino no espaço unitário, com uma amostra por linha.
         :type latin_sample: np.ndarray
         :param num_samples: Número de amostras que foram geradas.
         :type num_samples: int
+        :param epsilon: Limite da amostragem ao redor do ponto de interesse.
+        :type epsilon: Union[float, np.ndarray]
         :return: DataFrame com as amostras.
         :rtype: pd.DataFrame
         """
         values_to_change = self._get_values_can_change(interest_point)
-        min_ = (interest_point_np - self.epsilon) * values_to_change
-        max_ = (interest_point_np + self.epsilon) * values_to_change
+        min_ = (interest_point_np - epsilon) * values_to_change
+        max_ = (interest_point_np + epsilon) * values_to_change
         min_, max_ = self._restrain_limits(min_, max_)
         # Realiza a transformação para colocar `latin_sample` ao redor de `interest_point_np`
-        sample = map(lambda x: min_ + x * (max_ - min_), latin_sample.T)
+        sample = min_ + latin_sample * (max_ - min_)
         # Reinserir os valores que não puderam ser alterados
         data_frame = self._reinsert_categorical_data(interest_point, sample)
         data_frame = self._reinsert_fixed_cols(interest_point, data_frame)
@@ -129,9 +370,7 @@ class LatinSampler(SamplerAbstract):
         :type max_: np.ndarray
         :return:
         """
-        min_ = np.array(list(map(lambda x: 0. if x < 0 else x, min_)))
-        max_ = np.array(list(map(lambda x: 1. if x > 1 else x, max_)))
-        return min_, max_
+        return np.maximum(min_, 0.), np.minimum(max_, 1.)
 
     def _reindex_data(self, data_frame, interest_point, num_samples):
         """Colocar valores de index a partir do index do ponto de interesse"""
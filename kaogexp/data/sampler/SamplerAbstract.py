@@ -1,5 +1,7 @@
 from abc import ABC, abstractmethod
+from typing import Optional, Union
 
+import numpy as np
 import pandas as pd
 
 
@@ -10,8 +12,24 @@ class SamplerAbstract(ABC):
     def epsilon(self) -> float:
         raise NotImplementedError
 
+    @property
+    @abstractmethod
+    def epsilon_inicial(self) -> Union[float, np.ndarray]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def realizar_amostragem(self, ponto_interesse: pd.Series, qtd_amostras: int,
+                            epsilon: Union[float, np.ndarray, None] = None,
+                            gerador: Optional[np.random.Generator] = None) -> pd.DataFrame:
+        raise NotImplementedError
+
+    @abstractmethod
+    def proximo_epsilon(self, epsilon: Union[float, np.ndarray]) -> Union[float, np.ndarray]:
+        raise NotImplementedError
+
     @abstractmethod
-    def realizar_amostragem(self, ponto_interesse: pd.Series, qtd_amostras: int) -> pd.DataFrame:
+    def refinar_epsilon(self, inferior: Union[float, np.ndarray],
+                        superior: Union[float, np.ndarray]) -> Optional[Union[float, np.ndarray]]:
         raise NotImplementedError
 
     @abstractmethod
@@ -1,41 +1,64 @@
-from random import choice
-from typing import Dict, List
+from typing import Dict, List, Optional
 
+import numpy as np
 import pandas as pd
 
 
 class RandomCategoricalSampler:
 
-    def __init__(self, data: pd.DataFrame, cat_cols: pd.Index, fixed_cols: pd.Index = pd.Index([])):
+    def __init__(self, data: pd.DataFrame, cat_cols: pd.Index, fixed_cols: pd.Index = pd.Index([]),
+                 gerador: Optional[np.random.Generator] = None):
         """
         Utiliza os dados para adquirir as possibilidades de valores categóricos a serem atribuídos em cada coluna.
 
         :param data: Conjunto de dados que inclui todas as possibilidades de valores categóricos,
-        que pode até mesmo incluir valores numéricos (dos quais não serão utilizados aqui).
+        que pode até mesmo incluir valores numéricos (dos quais não serão utilizados aqui). Apenas os valores únicos
+        das colunas alteradas são mantidos, sem copiar o conjunto.
         :type data: pd.DataFrame
         :param cat_cols: Colunas categóricas que podem ser alteradas pela amostragem.
         :type cat_cols: pd.Index
         :param fixed_cols: Colunas que não devem ser alteradas. Pode incluir colunas numéricas, mas serào filtradas
         para uso dessa classe.
+        :param gerador: Gerador utilizado quando nenhum é informado em `realizar_amostragem`. Se None, é criado um
+        gerador sem seed.
+        :type gerador: Optional[np.random.Generator]
         """
-        self.data = data.copy()
         self.cat_cols = cat_cols.copy()
         self.fixed_cols = fixed_cols.copy() if fixed_cols is not None else pd.Index([])
 
         self.colunas_alteradas = self._definir_colunas_alteradas()
-        self.unique_cat_cols = self._obter_valores_cat_unicos()
+        self.unique_cat_cols = self._obter_valores_cat_unicos(data)
+        self._gerador = gerador if gerador is not None else np.random.default_rng()
+        # Valores de cada coluna, indexados pelo código utilizado na amostragem
+        self._valores_cat = {col: np.array(valores, dtype=object) for col, valores in self.unique_cat_cols.items()}
 
-    def realizar_amostragem(self, amostragem: pd.DataFrame) -> pd.DataFrame:
+    def realizar_amostragem(self, amostragem: pd.DataFrame,
+                            gerador: Optional[np.random.Generator] = None) -> pd.DataFrame:
         """
         Para cada linha da amostragem, alterar as colunas categóricas possíveis para outro dado categórico.
+        Os valores de cada coluna são convertidos em códigos e a cada código é somado um deslocamento aleatório em
+        [1, n), módulo n, sendo n a quantidade de valores da coluna, o que sempre resulta em um valor diferente do
+        atual. Valores desconhecidos são substituídos por qualquer um dos n valores e colunas com um único valor não
+        são alteradas.
 
         :param amostragem: Dados onde serão alteradas as colunas categóricas
         :type amostragem: pd.DataFrame
+        :param gerador: Gerador dos deslocamentos. Se None, é utilizado o gerador do sampler.
+        :type gerador: Optional[np.random.Generator]
         :return: Amostra, com dados categóricos alterados aleatóriamente.
         :rtype: pd.DataFrame
         """
+        gerador = gerador if gerador is not None else self._gerador
         amostragem = amostragem.copy()
-        amostragem = amostragem.apply(self._aleatorizar_series, axis=1)
+        for col, valores in self._valores_cat.items():
+            n = valores.shape[0]
+            if n < 2:
+                continue
+            codigos = pd.Categorical(amostragem[col], categories=valores).codes.astype(np.int64)
+            desconhecidos = codigos < 0
+            codigos = (codigos + gerador.integers(1, n, size=codigos.shape[0])) % n
+            codigos[desconhecidos] = gerador.integers(0, n, size=np.count_nonzero(desconhecidos))
+            amostragem[col] = pd.Series(valores[codigos], index=amostragem.index).infer_objects()
         return amostragem
 
     def _definir_colunas_alteradas(self):
@@ -48,19 +71,16 @@ class RandomCategoricalSampler:
         fix_cols = self.fixed_cols.tolist()
         return pd.Index(list(filter(lambda x: x not in fix_cols, cat_cols)))
 
-    def _obter_valores_cat_unicos(self) -> Dict[str, List]:
+    def _obter_valores_cat_unicos(self, data: pd.DataFrame) -> Dict[str, List]:
         """
-        Obtêm os valores únicos de cada coluna categórica que pode ser alterada.
+        Obtêm os valores únicos de cada coluna categórica que pode ser alterada, lendo apenas essas colunas de `data`.
 
+        :param data: Conjunto de dados com as colunas categóricas.
+        :type data: pd.DataFrame
         :return: Dados únicos da cada coluna categórica.
         :rtype: Dict[str, List]
         """
         result = {}
         for col in self.colunas_alteradas:
-            result[col] = self.data[col].unique().tolist()
+            result[col] = data[col].unique().tolist()
         return result
-
-    def _aleatorizar_series(self, row: pd.Series):
-        for col, item in row[self.colunas_alteradas].iteritems():
-            row[col] = choice(list(filter(lambda x: x != item, self.unique_cat_cols[col])))
-        return row
@@ -1,4 +1,4 @@
-from typing import Tuple
+from typing import Dict, Tuple
 from typing import Union
 
 import numpy as np
@@ -15,11 +15,13 @@ class DatasetTreatment(TreatmentAbstract):
     def __init__(self, dataset: pd.DataFrame):
         nomes_colunas_encoded, nomes_colunas_originais = self._obter_colunas(dataset)
         super().__init__(nomes_colunas_originais, nomes_colunas_encoded)
+        self._compilar_encoder(dataset)
 
     def encode(self, instancia: Union[pd.Series, pd.DataFrame]) -> Union[pd.Series, pd.DataFrame]:
         """
         Codifica uma instância ou um conjunto de instâncias. Os dados retornados estão em um formato que pode ser
-        utilizado pelo modelo para realizar a classificação dos dados.
+        utilizado pelo modelo para realizar a classificação dos dados, com as colunas na ordem de
+        `nomes_colunas_encoded`.
 
         :param instancia: Instância ou conjunto de instâncias a ser codificada.
         :type instancia: Union[pd.Series, pd.DataFrame]
@@ -30,17 +32,37 @@ class DatasetTreatment(TreatmentAbstract):
             return self.encode(pd.DataFrame([instancia])).iloc[0]
 
         elif isinstance(instancia, pd.DataFrame):
-            dummies = pd.get_dummies(instancia.drop(ColunaYSingleton().NOME_COLUNA_Y, axis=1, errors='ignore'))
-            missing_cols = self._get_missing_cols(dummies)
-            dummies = dummies.assign(**{col: 0 for col in missing_cols})
-            if ColunaYSingleton().NOME_COLUNA_Y in instancia.columns:
-                dummies = pd.concat([dummies, instancia[ColunaYSingleton().NOME_COLUNA_Y]], axis=1)
-            assert ColunaYSingleton().NOME_COLUNA_Y in dummies if ColunaYSingleton().NOME_COLUNA_Y in instancia else ColunaYSingleton().NOME_COLUNA_Y not in dummies
-            assert self._get_missing_cols(dummies).empty
-            return dummies
+            nome_y = ColunaYSingleton().NOME_COLUNA_Y
+            encoded = pd.DataFrame(self.encode_array(instancia), index=instancia.index,
+                                   columns=self.nomes_colunas_encoded.drop(nome_y))
+            if nome_y in instancia.columns:
+                encoded[nome_y] = instancia[nome_y]
+            return encoded
         else:
             raise TypeError(f'Tipo inválido de instância: {type(instancia)}')
-        pass
+
+    def encode_array(self, instancia: pd.DataFrame) -> np.ndarray:
+        """
+        Codifica um conjunto de instâncias diretamente em um array, sem a coluna de classe.
+        Cada valor categórico é convertido na posição da sua coluna dummy, definida a partir das categorias do conjunto
+        de dados utilizado na criação do tratador. Categorias desconhecidas não ativam nenhuma coluna.
+
+        :param instancia: Conjunto de instâncias a ser codificado. A coluna de classe, se existir, é ignorada.
+        :type instancia: pd.DataFrame
+        :return: Array com uma linha por instância e as colunas de `nomes_colunas_encoded`, exceto a de classe.
+        :rtype: np.ndarray
+        """
+        encoded = np.zeros((instancia.shape[0], self._num_colunas_x))
+        for coluna, posicao in self._posicoes_numericas.items():
+            if coluna in instancia.columns:
+                encoded[:, posicao] = instancia[coluna].to_numpy(dtype=float)
+        linhas = np.arange(instancia.shape[0])
+        for coluna, (categorias, posicoes) in self._posicoes_categoricas.items():
+            if coluna in instancia.columns:
+                codigos = pd.Categorical(instancia[coluna], categories=categorias).codes
+                conhecidos = codigos >= 0
+                encoded[linhas[conhecidos], posicoes[codigos[conhecidos]]] = 1
+        return encoded
 
     def decode(self, instancia: pd.Series) -> pd.Series:
         raise NotImplementedError
@@ -63,6 +85,33 @@ class DatasetTreatment(TreatmentAbstract):
 
     def atualizar_colunas(self, dataset: pd.DataFrame) -> None:
         self._nomes_colunas_encoded, self._nomes_colunas_originais = self._obter_colunas(dataset)
+        self._compilar_encoder(dataset)
+
+    def _compilar_encoder(self, dataset: pd.DataFrame) -> None:
+        """
+        Define, para cada coluna original, a sua posição no array codificado. Colunas numéricas ocupam uma única
+        posição, enquanto cada categoria de uma coluna categórica ocupa a posição da sua coluna dummy.
+
+        :param dataset: Conjunto de dados utilizado para obter as colunas.
+        :type dataset: pd.DataFrame
+        :raise ValueError: Se alguma categoria não tiver a sua coluna codificada.
+        """
+        x = dataset.drop(ColunaYSingleton().NOME_COLUNA_Y, axis=1, errors='ignore')
+        colunas_x = self.nomes_colunas_encoded.drop(ColunaYSingleton().NOME_COLUNA_Y)
+        self._num_colunas_x = len(colunas_x)
+        self._posicoes_numericas: Dict[str, int] = {}
+        self._posicoes_categoricas: Dict[str, Tuple[pd.Index, np.ndarray]] = {}
+        for coluna in x.columns:
+            if coluna in colunas_x:
+                self._posicoes_numericas[coluna] = colunas_x.get_loc(coluna)
+                continue
+            # Mesmas categorias e nomes de colunas gerados por `pd.get_dummies`
+            categorias = pd.Categorical(x[coluna]).categories
+            posicoes = colunas_x.get_indexer([f'{coluna}_{categoria}' for categoria in categorias])
+            if (posicoes < 0).any():
+                raise ValueError(f'Colunas codificadas ausentes para as categorias de {coluna}: '
+                                 f'{list(categorias[posicoes < 0])}')
+            self._posicoes_categoricas[coluna] = (categorias, posicoes)
 
     @staticmethod
     def _interpolar_na(dataset: pd.DataFrame):
@@ -108,20 +157,10 @@ class DatasetTreatment(TreatmentAbstract):
         nomes_colunas_encoded = pd.Index(dummy_columns.to_list() + [ColunaYSingleton().NOME_COLUNA_Y])
         return nomes_colunas_encoded, nomes_colunas_originais
 
-    def _get_missing_cols(self, dummies: pd.DataFrame) -> pd.Index:
-        """
-        Retorna as colunas que não estão presentes em `dummies`.
-
-        :param dummies: `pd.DataFrame` com colunas a serem verificadas.
-        :type dummies: pd.DataFrame
-        :return: Colunas que não estão presentes em `dummies` mas que são previstas no formato encoding.
-        :rtype: pd.Index
-        """
-        return self.nomes_colunas_encoded.drop(ColunaYSingleton().NOME_COLUNA_Y).difference(dummies.columns)
-
     @staticmethod
     def _obter_cols_categoricas(dataset):
         columns = dataset.drop(ColunaYSingleton().NOME_COLUNA_Y, axis=1, errors='ignore').select_dtypes(
             ['category']).columns
-        assert ColunaYSingleton().NOME_COLUNA_Y not in columns
+        if ColunaYSingleton().NOME_COLUNA_Y in columns:
+            raise ValueError(f'A coluna {ColunaYSingleton().NOME_COLUNA_Y} não pode ser tratada como categórica')
         return columns
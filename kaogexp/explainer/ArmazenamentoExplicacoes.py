@@ -0,0 +1,155 @@
+import json
+import os
+import pickle
+import threading
+from typing import Any, Dict, Hashable, Iterator, Optional, Tuple
+
+from kaogexp.explainer.methods.MethodAbstract import MethodAbstract
+
+
+class ArmazenamentoExplicacoes:
+    """
+    Armazenamento em disco, somente de acréscimo, das explicações já concluídas, indexadas pelo index da instância.
+    Permite retomar uma execução interrompida explicando apenas as instâncias que ainda não estão armazenadas.
+
+    O diretório contém dois arquivos:
+    - `dados.pkl`: as explicações serializadas com `pickle`, uma após a outra;
+    - `indice.jsonl`: uma linha por explicação, com o index da instância, a posição e o tamanho do registro em
+      `dados.pkl`.
+
+    Cada explicação é escrita primeiro em `dados.pkl` e só então registrada no índice. Ao abrir o diretório, apenas o
+    índice é lido: uma linha incompleta, interrompida durante a escrita, é descartada, assim como qualquer dado em
+    `dados.pkl` após o último registro indexado. Assim, a interrupção do processo em qualquer momento perde no máximo a
+    explicação que estava sendo escrita.
+    """
+
+    ARQUIVO_DADOS = 'dados.pkl'
+    ARQUIVO_INDICE = 'indice.jsonl'
+
+    def __init__(self, diretorio: str, sincronizar: bool = True):
+        """
+        :param diretorio: Diretório do armazenamento. É criado se não existir.
+        :type diretorio: str
+        :param sincronizar: Se True, cada escrita é forçada para o disco com `os.fsync`, garantindo que as explicações
+        registradas sobrevivam também a uma queda do sistema, e não apenas do processo.
+        :type sincronizar: bool
+        """
+        os.makedirs(diretorio, exist_ok=True)
+        self._diretorio = diretorio
+        self._sincronizar = sincronizar
+        self._lock = threading.Lock()
+        self._posicoes: Dict[Hashable, Tuple[int, int]] = {}
+
+        caminho_indice = os.path.join(diretorio, self.ARQUIVO_INDICE)
+        tamanho_indice = self._carregar_indice(caminho_indice)
+        fim_dados = max((posicao + tamanho for posicao, tamanho in self._posicoes.values()), default=0)
+
+        self._indice = open(caminho_indice, 'ab')
+        self._indice.truncate(tamanho_indice)
+        self._dados = open(os.path.join(diretorio, self.ARQUIVO_DADOS), 'ab+')
+        self._dados.truncate(fim_dados)
+
+    def _carregar_indice(self, caminho: str) -> int:
+        """
+        Lê o índice existente, ignorando uma última linha incompleta.
+
+        :return: Tamanho, em bytes, da parte válida do índice.
+        :rtype: int
+        """
+        if not os.path.exists(caminho):
+            return 0
+        tamanho_valido = 0
+        with open(caminho, 'rb') as file:
+            for linha in file:
+                if not linha.endswith(b'\n'):
+                    break
+                chave, posicao, tamanho = json.loads(linha)
+                self._posicoes[self._chave(chave)] = (posicao, tamanho)
+                tamanho_valido += len(linha)
+        return tamanho_valido
+
+    @staticmethod
+    def _chave(index: Any) -> Hashable:
+        """Converte o index para um valor nativo do Python, igual antes e depois de passar pelo JSON."""
+        if hasattr(index, 'item'):
+            index = index.item()
+        return tuple(index) if isinstance(index, list) else index
+
+    @property
+    def diretorio(self) -> str:
+        return self._diretorio
+
+    def __len__(self) -> int:
+        return len(self._posicoes)
+
+    def __contains__(self, index: Hashable) -> bool:
+        return self._chave(index) in self._posicoes
+
+    def __iter__(self) -> Iterator[Hashable]:
+        """Index das instâncias armazenadas, na ordem em que foram adicionadas."""
+        return iter(list(self._posicoes))
+
+    def adicionar(self, index: Hashable, explicacao: Optional[MethodAbstract]) -> None:
+        """
+        Acrescenta a explicação de uma instância. Pode ser chamado por várias threads simultaneamente.
+
+        :param index: Index da instância explicada.
+        :type index: Hashable
+        :param explicacao: Explicação encontrada, ou None se não foi encontrada, para que a instância também não seja
+        explicada novamente.
+        :type explicacao: Optional[MethodAbstract]
+        :raise KeyError: Se a instância já estiver armazenada.
+        :raise TypeError: Se o index não puder ser representado em JSON.
+        """
+        chave = self._chave(index)
+        # Validado antes de escrever o registro, para que um index inválido não deixe dados sem entrada no índice
+        try:
+            chave_json = json.dumps(chave)
+        except TypeError as e:
+            raise TypeError(f'Index {index!r} cannot be stored as JSON.') from e
+        registro = pickle.dumps(explicacao, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            if chave in self._posicoes:
+                raise KeyError(f'Instance {index} is already stored.')
+            posicao = self._dados.seek(0, os.SEEK_END)
+            linha = f'[{chave_json}, {posicao}, {len(registro)}]\n'
+            self._escrever(self._dados, registro)
+            self._escrever(self._indice, linha.encode())
+            self._posicoes[chave] = (posicao, len(registro))
+
+    def _escrever(self, file, conteudo: bytes) -> None:
+        file.write(conteudo)
+        file.flush()
+        if self._sincronizar:
+            os.fsync(file.fileno())
+
+    def obter(self, index: Hashable) -> Optional[MethodAbstract]:
+        """
+        Lê a explicação de uma instância, sem ler as demais.
+
+        :param index: Index da instância.
+        :type index: Hashable
+        :return: Explicação armazenada.
+        :rtype: Optional[MethodAbstract]
+        :raise KeyError: Se a instância não estiver armazenada.
+        """
+        posicao, tamanho = self._posicoes[self._chave(index)]
+        with self._lock:
+            self._dados.seek(posicao)
+            registro = self._dados.read(tamanho)
+        return pickle.loads(registro)
+
+    def itens(self) -> Iterator[Tuple[Hashable, Optional[MethodAbstract]]]:
+        """Pares com o index e a explicação de cada instância armazenada, na ordem em que foram adicionadas."""
+        for index in self:
+            yield index, self.obter(index)
+
+    def fechar(self) -> None:
+        self._dados.close()
+        self._indice.close()
+
+    def __enter__(self) -> 'ArmazenamentoExplicacoes':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.fechar()
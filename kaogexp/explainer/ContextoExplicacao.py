@@ -0,0 +1,118 @@
+import time
+from typing import Optional, Union
+
+import numpy as np
+
+from kaogexp.data.sampler.SamplerAbstract import SamplerAbstract
+from kaogexp.explainer.PoliticaAmostras import PoliticaAmostras
+
+
+class ContextoExplicacao:
+    """
+    Estado de uma única explicação: o epsilon e a quantidade de amostras usados na amostragem, os limites conhecidos
+    para refinar o epsilon e o gerador aleatório da explicação.
+    Cada explicação cria o seu próprio contexto, de forma que o mesmo `KAOGExp`, e o seu sampler, possam atender
+    várias explicações simultâneas sem compartilhar estado mutável.
+    """
+
+    def __init__(self, sampler: SamplerAbstract, num_amostras: int, politica: Optional[PoliticaAmostras] = None,
+                 gerador: Optional[np.random.Generator] = None, iniciar: bool = True):
+        """
+        :param sampler: Sampler que define o epsilon inicial e como ele é incrementado e refinado.
+        :type sampler: SamplerAbstract
+        :param num_amostras: Quantidade de amostras quando não há `politica`.
+        :type num_amostras: int
+        :param politica: Política que define a quantidade inicial de amostras e como ela cresce. Se None, a quantidade
+        é sempre `num_amostras`.
+        :type politica: Optional[PoliticaAmostras]
+        :param gerador: Gerador aleatório exclusivo desta explicação, utilizado nas amostragens. Se None, são utilizados
+        os geradores dos samplers.
+        :type gerador: Optional[np.random.Generator]
+        :param iniciar: Se o tempo da explicação começa a ser medido na criação do contexto. Se False, é medido apenas a
+        partir de `iniciar`, além do tempo atribuído por `adicionar_tempo`.
+        :type iniciar: bool
+        """
+        self._sampler = sampler
+        self._politica = politica
+        self.gerador = gerador
+        # Tempo atribuído à explicação antes de o relógio ser iniciado, como a sua parte de uma amostragem em lote
+        self._tempo_acumulado = 0.
+        self._inicio: Optional[float] = time.perf_counter() if iniciar else None
+        self.epsilon = sampler.epsilon_inicial
+        self.num_amostras = politica.inicial if politica is not None else num_amostras
+        # Maior epsilon cuja amostragem não foi suficiente e menor epsilon com amostragem válida durante o refinamento
+        self._epsilon_invalido: Optional[Union[float, np.ndarray]] = None
+        self._epsilon_valido: Optional[Union[float, np.ndarray]] = None
+
+    @property
+    def tempo_decorrido(self) -> float:
+        """Tempo, em segundos, gasto nesta explicação: o tempo atribuído mais o tempo desde o início do relógio."""
+        if self._inicio is None:
+            return self._tempo_acumulado
+        return self._tempo_acumulado + time.perf_counter() - self._inicio
+
+    def iniciar(self) -> None:
+        """Inicia a medição do tempo desta explicação, se ainda não foi iniciada."""
+        if self._inicio is None:
+            self._inicio = time.perf_counter()
+
+    def adicionar_tempo(self, segundos: float) -> None:
+        """
+        Atribui à explicação um tempo gasto fora dela, como a sua parte de uma amostragem feita em lote.
+
+        :param segundos: Tempo, em segundos, a ser adicionado.
+        :type segundos: float
+        """
+        self._tempo_acumulado += segundos
+
+    def incrementar_epsilon(self) -> None:
+        """
+        Avança o epsilon deste contexto, sem alterar o sampler.
+
+        :raise ValueError: se o valor de epsilon atingir o valor máximo.
+        """
+        proximo = self._sampler.proximo_epsilon(self.epsilon)
+        self._epsilon_invalido = self.epsilon
+        self._epsilon_valido = None
+        self.epsilon = proximo
+
+    def registrar_falha(self) -> None:
+        """
+        Aumenta a quantidade de amostras segundo a política, após uma amostragem sem a classe desejada ou uma
+        tentativa em que o método não encontrou uma explicação, independentemente de como o epsilon é alterado.
+        O limite de tempo da política é comparado com `tempo_decorrido`, que considera apenas o tempo desta explicação.
+        """
+        if self._politica is not None:
+            self.num_amostras = self._politica.proxima_quantidade(self.num_amostras, self.tempo_decorrido)
+
+    def registrar_amostragem(self, valida: bool) -> bool:
+        """
+        Registra o resultado da amostragem feita com `epsilon` e define o próximo epsilon a ser utilizado.
+        Enquanto nenhuma amostragem for válida, o epsilon é incrementado. Depois disso, o sampler pode refinar o
+        epsilon entre o maior valor inválido e o menor valor válido conhecidos. Toda amostragem inválida, inclusive
+        durante o refinamento, aumenta a quantidade de amostras segundo a política.
+
+        :param valida: Se a amostragem feita com `epsilon` contém a classe desejada.
+        :type valida: bool
+        :return: True se a busca terminou, sendo `epsilon` o menor epsilon válido encontrado.
+        :rtype: bool
+        :raise ValueError: se o valor de epsilon atingir o valor máximo sem uma amostragem válida.
+        """
+        if valida:
+            self._epsilon_valido = self.epsilon
+        else:
+            self.registrar_falha()
+            if self._epsilon_valido is None:
+                self.incrementar_epsilon()
+                return False
+            self._epsilon_invalido = self.epsilon
+
+        proximo = None
+        if self._epsilon_invalido is not None:
+            proximo = self._sampler.refinar_epsilon(self._epsilon_invalido, self._epsilon_valido)
+        if proximo is None:
+            self.epsilon = self._epsilon_valido
+            self._epsilon_valido = None
+            return True
+        self.epsilon = proximo
+        return False
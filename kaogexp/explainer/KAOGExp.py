@@ -1,6 +1,12 @@
 import logging
+import math
+import multiprocessing
+import time
 import warnings
-from typing import Union, Type, Optional, Tuple
+import zlib
+from concurrent.futures import ProcessPoolExecutor, Future, wait, FIRST_COMPLETED
+from itertools import islice
+from typing import Union, Type, Optional, Tuple, List, Dict, Iterator, Hashable
 
 import numpy as np
 import pandas as pd
@@ -11,7 +17,13 @@ from kaogexp.data.loader.DatasetAbstract import DatasetAbstract
 from kaogexp.data.loader.DatasetFromMemory import DatasetFromMemory
 from kaogexp.data.sampler.SamplerAbstract import SamplerAbstract
 from kaogexp.data.sampler.categorical_sampler import RandomCategoricalSampler
+from kaogexp.explainer import parallel
+from kaogexp.explainer.ArmazenamentoExplicacoes import ArmazenamentoExplicacoes
+from kaogexp.explainer.ContextoExplicacao import ContextoExplicacao
+from kaogexp.explainer.PoliticaAmostras import PoliticaAmostras
 from kaogexp.explainer.kaog.custom_kaog import KAOGAdaptado
+from kaogexp.explainer.methods.Counterfactual import Counterfactual
+from kaogexp.explainer.methods.CounterfactualResult import CounterfactualResult
 from kaogexp.explainer.methods.MethodAbstract import MethodAbstract
 from kaogexp.explainer.otimizer import SparsityOptimization
 from kaogexp.model.ModelAbstract import ModelAbstract
@@ -21,27 +33,54 @@ warnings.filterwarnings('ignore', message=r'.*The feature names should match tho
 
 class KAOGExp:
     NUM_SAMPLES = 100
+    # Lote padrão de `explicar_iter` com um único processo, pequeno para que as explicações sejam devolvidas logo
+    TAMANHO_LOTE_SERIAL = 8
     LIMITE_EPSILON = 1
 
     logger = logging.getLogger(__name__)
 
     def __init__(self, dataset: DatasetAbstract, modelo: ModelAbstract, sampler_numeric: SamplerAbstract,
-                 fixed_cols: Optional[pd.Index] = None, otimizar: bool = True):
+                 fixed_cols: Optional[pd.Index] = None, otimizar: Union[bool, SparsityOptimization] = True,
+                 politica_amostras: Optional[PoliticaAmostras] = None, amostragem_incremental: bool = False,
+                 resultado_compacto: bool = False, seed: Optional[int] = None):
         """
 
         :param dataset: Utilizado para obter informações sobre o dataset, como o tratador e comunas categóricas.
         :param modelo: Classificador utilizado sobre o dataset.
         :param sampler_numeric: Utilizado para obter amostras ao redor de uma instância sendo explicada.
         :param fixed_cols: Colunas fixas do dataset que não são alteradas durante a explicação.
+        :param otimizar: Se True, as explicações são otimizadas por `SparsityOptimization`. Também pode ser passado o
+        otimizador a ser utilizado, como `GreedySparsityOptimization` ou `BeamSparsityOptimization`, que limitam o
+        número de chamadas ao modelo.
+        :param politica_amostras: Define a quantidade de amostras de cada explicação, que começa pequena e cresce a
+        cada falha. Se None, são sempre utilizadas `NUM_SAMPLES` amostras.
+        :param amostragem_incremental: Se True, quando o método não encontra uma explicação, as amostras já geradas e
+        as suas classificações são mantidas, e apenas as novas amostras, com o epsilon maior, são classificadas e
+        adicionadas ao KAOG.
+        :param resultado_compacto: Se True, cada `Counterfactual` encontrado é convertido em um `CounterfactualResult`,
+        que não mantém o KAOG nem as distâncias utilizados na busca.
+        :param seed: Seed da qual é derivado um gerador independente para cada instância explicada, a partir do seu
+        index. Assim, o resultado de uma instância não depende da ordem, do lote ou do processo em que ela é explicada.
+        Se None, é utilizada a seed do sampler, quando existir.
+
+        O estado de cada explicação fica em um `ContextoExplicacao`, portanto um mesmo objeto pode ser utilizado por
+        várias threads ao mesmo tempo.
         """
         self.dataset = dataset
         self.modelo = modelo
         self.sampler = sampler_numeric
         self.fixed_cols = fixed_cols.copy() if fixed_cols is not None else None
-        self._busca_invalida = False
-        self._otimizar = otimizar
-        self._otimizador = SparsityOptimization(modelo, dataset.nomes_colunas_categoricas)
+        self.politica_amostras = politica_amostras
+        self._amostragem_incremental = amostragem_incremental
+        self._resultado_compacto = resultado_compacto
+        if isinstance(otimizar, SparsityOptimization):
+            self._otimizador: Optional[SparsityOptimization] = otimizar
+        elif otimizar:
+            self._otimizador = SparsityOptimization(modelo, dataset.nomes_colunas_categoricas)
+        else:
+            self._otimizador = None
         self._sampler_cat = RandomCategoricalSampler(dataset.dataset(), dataset.nomes_colunas_categoricas, fixed_cols)
+        self._semente = np.random.SeedSequence(seed if seed is not None else getattr(sampler_numeric, 'seed', None))
 
         self.sampler.fixed_cols = self.fixed_cols
 
@@ -58,6 +97,7 @@ class KAOGExp:
         com a classificação desejada.
         Quando a amostragem for apropriada, então é criado o KAOG e enviado para `metodo`, que será responsável pela
         estratégia de encontrar a melhor explicação.
+        Para um `pd.DataFrame`, a amostragem de todas as instâncias é feita em lote, ver `_explicar_lote`.
 
         :param instancia: Valor único ou conjunto de dados a serem explicados. Não deve estar tratado.
         :type instancia: Union[pd.Series, pd.DataFrame]
@@ -71,9 +111,7 @@ class KAOGExp:
         """
         self._assert_instance_compatibility(instancia)
         if isinstance(instancia, pd.DataFrame):
-            total = instancia.shape[0]
-            return tuple(self._explicar(instancia, metodo, index=i, total=total, **kwargs) for i, (_, instancia) in
-                         enumerate(instancia.iterrows()))
+            return self._explicar_lote(instancia, metodo, **kwargs)
 
         elif isinstance(instancia, pd.Series):
             return self._explicar(instancia, metodo, **kwargs)
@@ -81,51 +119,315 @@ class KAOGExp:
         else:
             raise TypeError(f'Instance must be of type pd.Series or pd.DataFrame. Got {type(instancia)}.')
 
-    def _explicar(self, instancia: pd.Series, metodo: Type[MethodAbstract], index=0, total=1, **kwargs) -> Optional[
-        MethodAbstract]:
+    def explicar_paralelo(self,
+                          instancias: pd.DataFrame,
+                          metodo: Type[MethodAbstract],
+                          num_processos: Optional[int] = None,
+                          tamanho_lote: Optional[int] = None,
+                          contexto_mp: Optional[str] = None,
+                          **kwargs,
+                          ) -> Tuple[Optional[MethodAbstract], ...]:
+        """
+        Explica as linhas de `instancias` distribuindo-as em um pool de processos, ver `explicar_iter`.
+
+        :param instancias: Conjunto de dados a serem explicados. Não deve estar tratado.
+        :type instancias: pd.DataFrame
+        :param metodo: Método a ser utilizado para explicar as instâncias.
+        :type metodo: Type[MethodAbstract]
+        :param num_processos: Quantidade de processos. Por padrão, a quantidade de CPUs.
+        :type num_processos: Optional[int]
+        :param tamanho_lote: Quantidade de linhas em cada tarefa. Por padrão, são criadas quatro tarefas por processo.
+        :type tamanho_lote: Optional[int]
+        :param contexto_mp: Método de início dos processos, como em `multiprocessing.get_context`.
+        :type contexto_mp: Optional[str]
+        :param kwargs: Parâmetros adicionais para o método passado.
+        :return: Explicações na mesma ordem das linhas de `instancias`, com None para as que não foram encontradas.
+        :rtype: Tuple[Optional[MethodAbstract], ...]
+        :raise TypeError: Se `instancias` não for um `pd.DataFrame`.
+        """
+        return tuple(explicacao for _, explicacao in self.explicar_iter(instancias, metodo, num_processos, tamanho_lote,
+                                                                         contexto_mp, ordenado=True, **kwargs))
+
+    def explicar_iter(self,
+                      instancias: pd.DataFrame,
+                      metodo: Type[MethodAbstract],
+                      num_processos: Optional[int] = 1,
+                      tamanho_lote: Optional[int] = None,
+                      contexto_mp: Optional[str] = None,
+                      ordenado: bool = True,
+                      armazenamento: Optional[ArmazenamentoExplicacoes] = None,
+                      **kwargs,
+                      ) -> Iterator[Tuple[Hashable, Optional[MethodAbstract]]]:
+        """
+        Explica as linhas de `instancias` lote a lote, devolvendo cada explicação com o index da sua linha. Com um
+        único processo, cada explicação é devolvida assim que é encontrada e, com mais processos, assim que o seu lote
+        termina.
+        Com mais de um processo, o explicador, `metodo` e `kwargs` são enviados para cada processo uma única vez, na
+        sua inicialização. Com o contexto `fork` nada é serializado, pois os processos herdam a memória do processo
+        principal. Cada tarefa contém apenas um lote de linhas, explicado com `_explicar_lote`, e no máximo duas
+        tarefas por processo ficam pendentes, limitando a memória utilizada pelos resultados ainda não consumidos.
+
+        :param instancias: Conjunto de dados a serem explicados. Não deve estar tratado.
+        :type instancias: pd.DataFrame
+        :param metodo: Método a ser utilizado para explicar as instâncias.
+        :type metodo: Type[MethodAbstract]
+        :param num_processos: Quantidade de processos. Com 1, as linhas são explicadas no próprio processo. Se None, é
+        utilizada a quantidade de CPUs.
+        :type num_processos: Optional[int]
+        :param tamanho_lote: Quantidade de linhas em cada lote. Por padrão, com um processo, os lotes têm
+        `TAMANHO_LOTE_SERIAL` linhas e, com mais processos, são criados quatro lotes por processo.
+        :type tamanho_lote: Optional[int]
+        :param contexto_mp: Método de início dos processos, como em `multiprocessing.get_context`.
+        :type contexto_mp: Optional[str]
+        :param ordenado: Se False, os lotes são devolvidos na ordem em que os processos terminam, e não na ordem das
+        linhas.
+        :type ordenado: bool
+        :param armazenamento: Se informado, as linhas cujo index já está armazenado não são explicadas nem devolvidas,
+        e cada nova explicação é acrescentada a ele antes de ser devolvida, permitindo retomar uma execução interrompida.
+        :type armazenamento: Optional[ArmazenamentoExplicacoes]
+        :param kwargs: Parâmetros adicionais para o método passado.
+        :return: Pares com o index da linha e a sua explicação, ou None se não foi encontrada.
+        :rtype: Iterator[Tuple[Hashable, Optional[MethodAbstract]]]
+        :raise TypeError: Se `instancias` não for um `pd.DataFrame`.
+        """
+        if not isinstance(instancias, pd.DataFrame):
+            raise TypeError(f'Instances must be of type pd.DataFrame. Got {type(instancias)}.')
+        self._assert_instance_compatibility(instancias)
+
+        if armazenamento is None:
+            yield from self._explicar_iter(instancias, metodo, num_processos, tamanho_lote, contexto_mp, ordenado,
+                                           **kwargs)
+            return
+        pendentes = instancias[[index not in armazenamento for index in instancias.index]]
+        for index, explicacao in self._explicar_iter(pendentes, metodo, num_processos, tamanho_lote, contexto_mp,
+                                                     ordenado, **kwargs):
+            armazenamento.adicionar(index, explicacao)
+            yield index, explicacao
+
+    def _explicar_iter(self, instancias: pd.DataFrame, metodo: Type[MethodAbstract], num_processos: Optional[int],
+                       tamanho_lote: Optional[int], contexto_mp: Optional[str], ordenado: bool,
+                       **kwargs) -> Iterator[Tuple[Hashable, Optional[MethodAbstract]]]:
+        """Gera as explicações de `explicar_iter`, sem validar `instancias`."""
+        total = instancias.shape[0]
+        if total == 0:
+            return
+        num_processos = num_processos or multiprocessing.cpu_count()
+        if tamanho_lote is None and num_processos == 1:
+            tamanho_lote = KAOGExp.TAMANHO_LOTE_SERIAL
+        elif tamanho_lote is None:
+            tamanho_lote = math.ceil(total / (num_processos * 4))
+        tarefas = ((inicio, instancias.iloc[inicio:inicio + tamanho_lote]) for inicio in range(0, total, tamanho_lote))
+
+        if num_processos == 1:
+            for inicio, lote in tarefas:
+                yield from zip(lote.index, self._explicar_lote_iter(lote, metodo, index_inicial=inicio, total=total,
+                                                                    **kwargs))
+            return
+
+        with ProcessPoolExecutor(max_workers=num_processos,
+                                 mp_context=multiprocessing.get_context(contexto_mp),
+                                 initializer=parallel.inicializar_worker,
+                                 initargs=(self, metodo, kwargs, total, ColunaYSingleton().NOME_COLUNA_Y)) as executor:
+            # Index das linhas de cada tarefa pendente, na ordem em que foram submetidas
+            pendentes: Dict[Future, pd.Index] = {}
+            for tarefa in islice(tarefas, num_processos * 2):
+                pendentes[executor.submit(parallel.explicar_lote, tarefa)] = tarefa[1].index
+            while pendentes:
+                if ordenado:
+                    futuro = next(iter(pendentes))
+                else:
+                    futuro = next(iter(wait(pendentes, return_when=FIRST_COMPLETED).done))
+                index = pendentes.pop(futuro)
+                for tarefa in islice(tarefas, 1):
+                    pendentes[executor.submit(parallel.explicar_lote, tarefa)] = tarefa[1].index
+                yield from zip(index, futuro.result())
+
+    def _explicar_lote(self, instancias: pd.DataFrame, metodo: Type[MethodAbstract], index_inicial: int = 0,
+                       total: Optional[int] = None, **kwargs) -> Tuple[Optional[MethodAbstract], ...]:
+        """Explica todas as linhas de `instancias`, como em `_explicar_lote_iter`."""
+        return tuple(self._explicar_lote_iter(instancias, metodo, index_inicial, total, **kwargs))
+
+    def _explicar_lote_iter(self, instancias: pd.DataFrame, metodo: Type[MethodAbstract], index_inicial: int = 0,
+                            total: Optional[int] = None, **kwargs) -> Iterator[Optional[MethodAbstract]]:
         """
-        Lógica para a explicação
+        Explica todas as linhas de `instancias`, devolvendo cada explicação assim que é encontrada.
+        A busca pela primeira amostragem válida é feita para todas as instâncias ao mesmo tempo: a cada valor de
+        epsilon, as amostragens das instâncias pendentes são classificadas em uma única chamada ao modelo. Somente
+        depois disso cada instância segue individualmente para a criação do KAOG e a busca por `metodo`.
+
+        :param instancias: Conjunto de dados a serem explicados. Não deve estar tratado.
+        :type instancias: pd.DataFrame
+        :param metodo: Método a ser utilizado para explicar as instâncias.
+        :type metodo: Type[MethodAbstract]
+        :param index_inicial: Posição da primeira linha de `instancias` em um conjunto maior, utilizada apenas no log.
+        :type index_inicial: int
+        :param total: Quantidade de linhas do conjunto maior, utilizada apenas no log.
+        :type total: Optional[int]
+        :param kwargs: Parâmetros adicionais para o método passado.
+        :return: Explicações na mesma ordem das linhas de `instancias`, com None para as que não foram encontradas.
+        :rtype: Iterator[Optional[MethodAbstract]]
+        """
+        classe_desejada = kwargs.get('classe_desejada', None)
+        linhas = [instancia for _, instancia in instancias.iterrows()]
+        amostras_validas = self._obter_amostras_validas_lote(classe_desejada, linhas)
+
+        total = total if total is not None else len(linhas)
+        for i, instancia in enumerate(linhas):
+            index = index_inicial + i
+            if i not in amostras_validas:
+                self.logger.error(f'Não foi possível encontrar uma amostra válida para a instância {index + 1}.')
+                yield None
+                continue
+            yield self._explicar(instancia, metodo, index=index, total=total, amostra_inicial=amostras_validas[i],
+                                 **kwargs)
+
+    def _obter_amostras_validas_lote(self, classe_desejada: int, instancias: List[pd.Series]) -> Dict[
+        int, Tuple[ContextoExplicacao, pd.DataFrame, pd.Series]]:
+        """
+        Realiza a amostragem ao redor de todas as `instancias`, alterando o epsilon apenas para aquelas cuja busca
+        ainda não terminou. Para cada instância é mantida a amostragem válida com o menor epsilon.
+
+        :param classe_desejada: Classe desejada.
+        :type classe_desejada: int
+        :param instancias: Instâncias a serem amostradas.
+        :type instancias: List[pd.Series]
+        :return: Para cada posição em `instancias` com amostragem válida, o seu contexto, a amostragem e a sua
+        classificação.
+        :rtype: Dict[int, Tuple[ContextoExplicacao, pd.DataFrame, pd.Series]]
+        """
+        # O relógio de cada contexto só é iniciado na sua explicação, e cada rodada do lote é dividida igualmente
+        # entre as instâncias que participaram dela
+        pendentes = {i: (instancia, self._criar_contexto(instancia, iniciar=False))
+                     for i, instancia in enumerate(instancias)}
+        validas = {}
+        while pendentes:
+            inicio = time.perf_counter()
+            amostragens = {i: self._realizar_amostragem(instancia, contexto)
+                           for i, (instancia, contexto) in pendentes.items()}
+            y_amostragens = self._classificar_lote(list(amostragens.values()))
+            parcela = (time.perf_counter() - inicio) / len(pendentes)
+            for _, contexto in pendentes.values():
+                contexto.adicionar_tempo(parcela)
+            for (i, amostragem), y_amostragem in zip(amostragens.items(), y_amostragens):
+                contexto = pendentes[i][1]
+                valida = self._amostra_valida(y_amostragem, classe_desejada)
+                if valida:
+                    validas[i] = (contexto, amostragem, y_amostragem)
+                try:
+                    concluida = contexto.registrar_amostragem(valida)
+                except ValueError as e:
+                    self.logger.error(f'Limite de epsilon atingido para a instância {i + 1}.\n{e}')
+                    concluida = True
+                if concluida:
+                    del pendentes[i]
+        return validas
+
+    def _explicar(self, instancia: pd.Series, metodo: Type[MethodAbstract], index=0, total=1,
+                  amostra_inicial: Optional[Tuple[ContextoExplicacao, pd.DataFrame, pd.Series]] = None,
+                  **kwargs) -> Optional[MethodAbstract]:
+        """
+        Lógica para a explicação.
+        Se `amostra_inicial` for informada, ela é usada como a primeira amostragem válida, continuando a partir do
+        seu contexto.
+        Com a amostragem incremental, cada nova tentativa realiza uma única amostragem com o epsilon maior, que é
+        adicionada às amostras anteriores, já classificadas.
         """
         logging.info(f'\n\nExplaining instance {index + 1} of {total}')
         classe_desejada = kwargs.get('classe_desejada', None)
-        self._reset_epsilon()
 
         try:
+            amostra_valida = None
+            if amostra_inicial is not None:
+                contexto, *amostra_valida = amostra_inicial
+                contexto.iniciar()
+            else:
+                contexto = self._criar_contexto(instancia)
+            # Amostras das tentativas anteriores, já classificadas e com os dados categóricos amostrados
+            amostras_anteriores: Optional[pd.DataFrame] = None
             while True:
-                amostragem, y_amostragem = self._obter_amostra_valida(classe_desejada, instancia)
+                if amostra_valida is None and amostras_anteriores is not None:
+                    amostragem = self._realizar_amostragem(instancia, contexto)
+                    amostra_valida = amostragem, self._classificar_amostragem(amostragem)
+                elif amostra_valida is None:
+                    amostra_valida = self._obter_amostra_valida(classe_desejada, instancia, contexto)
+                amostragem, y_amostragem = amostra_valida
+                amostra_valida = None
 
                 self.logger.info(f'Amostragem válida encontrada. Realizando KAOG.')
                 amostragem_com_y = amostragem.copy()
                 amostragem_com_y[ColunaYSingleton().NOME_COLUNA_Y] = y_amostragem
+                if amostras_anteriores is not None:
+                    inicio = amostras_anteriores.index.max() + 1
+                    amostragem_com_y.index = range(inicio, inicio + amostragem_com_y.shape[0])
                 amostra_completa = amostragem_com_y.append(instancia)
-                amostra_completa = self._realizar_amostragem_categorica(amostra_completa)
+                amostra_completa = self._realizar_amostragem_categorica(amostra_completa, contexto)
+                if amostras_anteriores is not None:
+                    amostra_completa = pd.concat([amostras_anteriores, amostra_completa])
                 kaog = self._criar_kaog(amostra_completa)
                 self.logger.info(f'KAOG criado.')
                 try:
                     result = metodo(kaog, instancia, **kwargs)
-                    if self._otimizar:
+                    if self._otimizador is not None:
                         result = self._otimizador.optimize(result)
+                    result.num_amostras = amostra_completa.shape[0] - 1
+                    result.epsilon = contexto.epsilon
+                    self.logger.info(f'Explicação encontrada com {result.num_amostras} amostras.')
+                    if self._resultado_compacto and isinstance(result, Counterfactual):
+                        result = CounterfactualResult.from_counterfactual(result, contexto.tempo_decorrido)
                     return result
                 except RuntimeError as e:
                     self.logger.info(f'{e}\nContinuando amostragem...')
-                    self._continuar_amostragem()
+                    if self._amostragem_incremental:
+                        # A instância explicada é sempre a última linha
+                        amostras_anteriores = amostra_completa.iloc[:-1]
+                    self._continuar_amostragem(contexto)
 
         except ValueError as e:
             self.logger.error(f'Não foi possível encontrar uma amostra válida.\n{e}\n\n')
             return None
 
-    def _obter_amostra_valida(self, classe_desejada: int, instancia: pd.Series):
-        amostragem: Union[pd.Series, None] = None
-        y_amostragem: Union[pd.Series, None] = None
-        while self._busca_invalida or not self._amostra_valida(y_amostragem, classe_desejada):
-            amostragem: pd.DataFrame = self._realizar_amostragem(instancia)
+    def _criar_contexto(self, instancia: Optional[pd.Series] = None, iniciar: bool = True) -> ContextoExplicacao:
+        """
+        Cria o contexto de uma explicação, com um gerador derivado da seed do explicador e do index de `instancia`.
+        Se `iniciar` for False, o tempo da explicação só começa a ser medido em `ContextoExplicacao.iniciar`.
+        """
+        semente = np.random.SeedSequence(self._semente.entropy,
+                                         spawn_key=(self._chave_semente(getattr(instancia, 'name', None)),))
+        return ContextoExplicacao(self.sampler, KAOGExp.NUM_SAMPLES, self.politica_amostras,
+                                  np.random.default_rng(semente), iniciar=iniciar)
+
+    @staticmethod
+    def _chave_semente(index) -> int:
+        """Converte o index de uma instância em um inteiro não negativo, estável entre execuções e processos."""
+        if index is None:
+            return 0
+        if isinstance(index, (int, np.integer)) and not isinstance(index, bool) and index >= 0:
+            return int(index)
+        return zlib.crc32(str(index).encode())
+
+    def _obter_amostra_valida(self, classe_desejada: int, instancia: pd.Series,
+                              contexto: ContextoExplicacao) -> Tuple[pd.DataFrame, pd.Series]:
+        """
+        Realiza amostragens com o epsilon definido por `contexto` até que a sua busca termine.
+
+        :return: A amostragem válida com o menor epsilon e a sua classificação.
+        :rtype: Tuple[pd.DataFrame, pd.Series]
+        :raise ValueError: se o valor de epsilon atingir o valor máximo.
+        """
+        amostra_valida = None
+        while True:
+            amostragem: pd.DataFrame = self._realizar_amostragem(instancia, contexto)
             y_amostragem: pd.Series = self._classificar_amostragem(amostragem)
-            self._busca_invalida = False
-        return amostragem, y_amostragem
+            valida = self._amostra_valida(y_amostragem, classe_desejada)
+            if valida:
+                amostra_valida = amostragem, y_amostragem
+            if contexto.registrar_amostragem(valida):
+                return amostra_valida
 
-    def _continuar_amostragem(self):
-        self._incrementar_epsilon()
-        self._busca_invalida = True
+    @staticmethod
+    def _continuar_amostragem(contexto: ContextoExplicacao):
+        contexto.registrar_falha()
+        contexto.incrementar_epsilon()
 
     def _assert_instance_compatibility(self, instance: Union[pd.Series, pd.DataFrame]) -> None:
         """
@@ -145,10 +447,10 @@ class KAOGExp:
 
         pd.testing.assert_index_equal(index, self.dataset.tratador.nomes_colunas_originais, check_order=False)
 
-    def _amostra_valida(self, y_amostragem: Union[pd.Series, None], classe_desejada: int) -> bool:
+    @staticmethod
+    def _amostra_valida(y_amostragem: Union[pd.Series, None], classe_desejada: int) -> bool:
         """
         Verifica se a amostragem é válida, ou seja, se existe alguma instância com a classificação desejada.
-        Caso ainda não seja válida, incrementa o valor de epsilon e tenta novamente.
 
         :param y_amostragem: Valores da classificação da amostragem, ou None se ainda não foi definida.
         :type y_amostragem: Union[pd.Series, None]
@@ -159,40 +461,29 @@ class KAOGExp:
         """
         if y_amostragem is None:
             return False
+        return bool(y_amostragem.isin([classe_desejada]).any())
 
-        desejada_any = y_amostragem.isin([classe_desejada]).any()
-        if not desejada_any:
-            self._incrementar_epsilon()
-        return desejada_any
-
-    def _incrementar_epsilon(self) -> None:
-        """
-        Incrementa o valor de epsilon, caso a amostragem não seja válida.
-        Se atingir o valor máximo, lança uma exceção.
-
-        :raise ValueError: se o valor de epsilon atingir o valor máximo.
-        """
-        self.sampler.increase_epsilon()
-
-    def _reset_epsilon(self):
-        """
-        Reseta o valor de epsilon para o valor inicial para a próxima amostragem.
-        """
-        self.sampler.reset_epsilon()
-
-    def _realizar_amostragem(self, instancia: pd.Series) -> pd.DataFrame:
+    def _realizar_amostragem(self, instancia: pd.Series, contexto: Optional[ContextoExplicacao] = None) -> pd.DataFrame:
         """
         Dado um ponto de instância, realiza a amostragem ao redor dele.
 
         :param instancia: Ponto de instância a ser amostrado.
         :type instancia: Union[pd.Series, pd.DataFrame]
+        :param contexto: Contexto da explicação, que define o epsilon e a quantidade de amostras. Se None, são
+        utilizados o epsilon do sampler e `NUM_SAMPLES`.
+        :type contexto: Optional[ContextoExplicacao]
         :return: Amostragem ao redor do ponto de instância.
         :rtype: np.ndarray
         """
-        self.logger.info(f'Realizando amostragem com epsilon {self.sampler.epsilon}.')
+        if contexto is not None:
+            epsilon, num_amostras = contexto.epsilon, contexto.num_amostras
+        else:
+            epsilon, num_amostras = self.sampler.epsilon, KAOGExp.NUM_SAMPLES
+        self.logger.info(f'Realizando amostragem com epsilon {epsilon} e {num_amostras} amostras.')
         if not isinstance(instancia, pd.Series):
             raise TypeError(f'`instancia` must be `pd.Series.` Got {type(instancia)}.')
-        return self.sampler.realizar_amostragem(instancia, KAOGExp.NUM_SAMPLES)
+        gerador = contexto.gerador if contexto is not None else None
+        return self.sampler.realizar_amostragem(instancia, num_amostras, epsilon, gerador)
 
     def _classificar_amostragem(self, amostragem: pd.DataFrame) -> pd.Series:
         """
@@ -207,6 +498,24 @@ class KAOGExp:
         predict = self.modelo.predict(encoded)
         return pd.Series(predict, index=amostragem.index, name=ColunaYSingleton().NOME_COLUNA_Y)
 
+    def _classificar_lote(self, amostragens: List[pd.DataFrame]) -> List[pd.Series]:
+        """
+        Classifica várias amostragens com uma única chamada ao modelo.
+
+        :param amostragens: Amostragens a serem classificadas. Os índices podem se repetir entre elas.
+        :type amostragens: List[pd.DataFrame]
+        :return: Classificação de cada amostragem, na mesma ordem de `amostragens`.
+        :rtype: List[pd.Series]
+        """
+        if not amostragens:
+            return []
+        lote = pd.concat(amostragens, ignore_index=True)
+        encoded = self.dataset.tratador.encode(lote)
+        predict = np.asarray(self.modelo.predict(encoded))
+        limites = np.cumsum([amostragem.shape[0] for amostragem in amostragens])[:-1]
+        return [pd.Series(y, index=amostragem.index, name=ColunaYSingleton().NOME_COLUNA_Y)
+                for amostragem, y in zip(amostragens, np.split(predict, limites))]
+
     def _criar_kaog(self, amostra_completa: pd.DataFrame) -> KAOG:
         colunas_categoricas = self.dataset.nomes_colunas_categoricas
         normalizador = self.dataset.normalizador
@@ -219,5 +528,7 @@ class KAOGExp:
             )
         )
 
-    def _realizar_amostragem_categorica(self, amostra_completa: pd.DataFrame):
-        return self._sampler_cat.realizar_amostragem(amostra_completa)
+    def _realizar_amostragem_categorica(self, amostra_completa: pd.DataFrame,
+                                        contexto: Optional[ContextoExplicacao] = None):
+        gerador = contexto.gerador if contexto is not None else None
+        return self._sampler_cat.realizar_amostragem(amostra_completa, gerador)
@@ -0,0 +1,47 @@
+import math
+from typing import Optional
+
+
+class PoliticaAmostras:
+    """
+    Define a quantidade de amostras geradas ao redor de cada instância explicada.
+    A explicação começa com `inicial` amostras, que são multiplicadas por `fator` sempre que a amostragem não contém
+    a classe desejada ou o método não encontra uma explicação. O crescimento é limitado por `maximo` e, se
+    `tempo_maximo` for definido, deixa de acontecer depois que a explicação gastar esse tempo.
+    """
+
+    def __init__(self, inicial: int = 20, fator: float = 2., maximo: int = 200, tempo_maximo: Optional[float] = None):
+        """
+        :param inicial: Quantidade de amostras da primeira amostragem.
+        :type inicial: int
+        :param fator: Fator de crescimento da quantidade de amostras. Deve ser maior que 1.
+        :type fator: float
+        :param maximo: Quantidade máxima de amostras.
+        :type maximo: int
+        :param tempo_maximo: Tempo, em segundos, a partir do qual a quantidade de amostras não é mais aumentada.
+        :type tempo_maximo: Optional[float]
+        """
+        if not 0 < inicial <= maximo:
+            raise ValueError("Inicial must be greater than 0 and not greater than maximo")
+        if fator <= 1:
+            raise ValueError("Fator must be greater than 1")
+        self.inicial = inicial
+        self.fator = fator
+        self.maximo = maximo
+        self.tempo_maximo = tempo_maximo
+
+    def proxima_quantidade(self, atual: int, tempo_decorrido: float) -> int:
+        """
+        Calcula a quantidade de amostras após uma falha.
+
+        :param atual: Quantidade de amostras atual.
+        :type atual: int
+        :param tempo_decorrido: Tempo, em segundos, já gasto na explicação, como em
+        `ContextoExplicacao.tempo_decorrido`.
+        :type tempo_decorrido: float
+        :return: Nova quantidade de amostras.
+        :rtype: int
+        """
+        if self.tempo_maximo is not None and tempo_decorrido >= self.tempo_maximo:
+            return atual
+        return min(max(atual + 1, math.ceil(atual * self.fator)), self.maximo)
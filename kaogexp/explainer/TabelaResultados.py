@@ -0,0 +1,220 @@
+import json
+import os
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from kaogexp.data.loader import ColunaYSingleton
+from kaogexp.data.treatment.TreatmentAbstract import TreatmentAbstract
+from kaogexp.explainer.methods.MethodAbstract import MethodAbstract
+
+
+class TabelaResultados:
+    """
+    Resultados de uma execução armazenados por coluna: um arquivo `.npy` para cada campo e um `meta.json` com os nomes
+    das colunas.
+    As instâncias original e modificada de cada explicação são armazenadas codificadas pelo tratador, com a coluna de
+    classe ao final, em matrizes com uma linha por instância explicada. As linhas cuja explicação não foi encontrada
+    contêm NaN e são indicadas por `encontrado`.
+    Os arquivos são lidos com `np.load(..., mmap_mode='r')`, de forma que as métricas são calculadas diretamente sobre
+    as matrizes, sem carregar as explicações ou os seus KAOGs.
+    """
+
+    ARQUIVO_META = 'meta.json'
+    CAMPOS = ('index', 'encontrado', 'original', 'modificada', 'classe_desejada', 'pureza_original',
+              'pureza_modificada', 'epsilon', 'tempo', 'num_amostras')
+
+    def __init__(self, diretorio: str, mmap: bool = True):
+        """
+        :param diretorio: Diretório criado por `escrever`.
+        :type diretorio: str
+        :param mmap: Se True, os arquivos são mapeados em memória em vez de lidos por completo.
+        :type mmap: bool
+        :raise FileNotFoundError: Se o diretório não contém uma tabela completa.
+        """
+        self._diretorio = diretorio
+        with open(os.path.join(diretorio, self.ARQUIVO_META)) as file:
+            meta = json.load(file)
+        self._colunas = pd.Index(meta['colunas'])
+        self._grupos = pd.Index(meta['grupos'])
+        self._colunas_categoricas = pd.Index(meta['colunas_categoricas'])
+        self._campos: Dict[str, np.ndarray] = {
+            campo: np.load(os.path.join(diretorio, f'{campo}.npy'), mmap_mode='r' if mmap else None)
+            for campo in self.CAMPOS}
+
+    @classmethod
+    def escrever(cls, diretorio: str, explicacoes: Iterable[Tuple[Hashable, Optional[MethodAbstract]]],
+                 tratador: TreatmentAbstract) -> 'TabelaResultados':
+        """
+        Cria a tabela a partir das explicações de uma execução. O `meta.json` é escrito por último, de forma que uma
+        escrita interrompida não resulta em uma tabela incompleta.
+
+        :param diretorio: Diretório da tabela. É criado se não existir.
+        :type diretorio: str
+        :param explicacoes: Pares com o index da instância e a sua explicação, ou None se não foi encontrada, como os
+        devolvidos por `KAOGExp.explicar_iter` ou `ArmazenamentoExplicacoes.itens`.
+        :type explicacoes: Iterable[Tuple[Hashable, Optional[MethodAbstract]]]
+        :param tratador: Tratador utilizado para codificar as instâncias.
+        :type tratador: TreatmentAbstract
+        :return: A tabela escrita.
+        :rtype: TabelaResultados
+        """
+        nome_y = ColunaYSingleton().NOME_COLUNA_Y
+        colunas = tratador.nomes_colunas_encoded.drop(nome_y, errors='ignore').append(pd.Index([nome_y]))
+        pares = list(explicacoes)
+        index = [index for index, _ in pares]
+        explicacoes = [explicacao for _, explicacao in pares]
+        encontrado = np.array([explicacao is not None for explicacao in explicacoes], dtype=bool)
+        validas: List[MethodAbstract] = [explicacao for explicacao in explicacoes if explicacao is not None]
+
+        def codificar(linhas: List[pd.Series]) -> np.ndarray:
+            matriz = np.full((len(explicacoes), len(colunas)), np.nan)
+            if linhas:
+                matriz[encontrado] = tratador.encode(pd.DataFrame(linhas)).reindex(columns=colunas).to_numpy(float)
+            return matriz
+
+        def escalar(valores: Iterable, vazio=np.nan, dtype=float) -> np.ndarray:
+            coluna = np.full(len(explicacoes), vazio, dtype=dtype)
+            coluna[encontrado] = [vazio if valor is None else valor for valor in valores]
+            return coluna
+
+        campos = {
+            'index': cls._converter_index(index),
+            'encontrado': encontrado,
+            'original': codificar([explicacao.instancia_original for explicacao in validas]),
+            'modificada': codificar([explicacao.instancia_modificada for explicacao in validas]),
+            'classe_desejada': escalar(explicacao.classe_desejada for explicacao in validas),
+            'pureza_original': escalar(explicacao.pureza_original for explicacao in validas),
+            'pureza_modificada': escalar(explicacao.pureza_modificada for explicacao in validas),
+            # Para um epsilon por feature, é armazenado o maior valor
+            'epsilon': escalar(None if explicacao.epsilon is None else np.max(explicacao.epsilon)
+                               for explicacao in validas),
+            'tempo': escalar(getattr(explicacao, 'tempo', None) for explicacao in validas),
+            'num_amostras': escalar((explicacao.num_amostras for explicacao in validas), vazio=-1, dtype=np.int64),
+        }
+
+        os.makedirs(diretorio, exist_ok=True)
+        caminho_meta = os.path.join(diretorio, cls.ARQUIVO_META)
+        if os.path.exists(caminho_meta):
+            os.remove(caminho_meta)
+        for campo, valores in campos.items():
+            np.save(os.path.join(diretorio, f'{campo}.npy'), valores, allow_pickle=False)
+        meta = {
+            'colunas': colunas.tolist(),
+            'grupos': [cls._coluna_original(coluna, tratador) for coluna in colunas],
+            'colunas_categoricas': tratador.nomes_colunas_categoricas_encoded.tolist(),
+            'nome_coluna_y': nome_y,
+        }
+        with open(caminho_meta + '.tmp', 'w') as file:
+            json.dump(meta, file)
+        os.replace(caminho_meta + '.tmp', caminho_meta)
+        return cls(diretorio)
+
+    @staticmethod
+    def _converter_index(index: Tuple[Hashable, ...]) -> np.ndarray:
+        """Converte o index para um array que pode ser mapeado em memória, utilizando `str` se não for numérico."""
+        convertido = np.asarray(index)
+        if convertido.dtype.kind not in 'biuf':
+            convertido = np.asarray([str(valor) for valor in index])
+        return convertido
+
+    @staticmethod
+    def _coluna_original(coluna: str, tratador: TreatmentAbstract) -> str:
+        """Coluna original que deu origem à coluna codificada `coluna`."""
+        if coluna in tratador.nomes_colunas_originais or coluna == ColunaYSingleton().NOME_COLUNA_Y:
+            return coluna
+        prefixos = [original for original in tratador.nomes_colunas_originais if coluna.startswith(f'{original}_')]
+        return max(prefixos, key=len) if prefixos else coluna
+
+    def __len__(self) -> int:
+        return self._campos['index'].shape[0]
+
+    @property
+    def colunas(self) -> pd.Index:
+        return self._colunas.copy()
+
+    @property
+    def index(self) -> np.ndarray:
+        return self._campos['index']
+
+    @property
+    def encontrado(self) -> np.ndarray:
+        return self._campos['encontrado']
+
+    @property
+    def original(self) -> np.ndarray:
+        return self._campos['original']
+
+    @property
+    def modificada(self) -> np.ndarray:
+        return self._campos['modificada']
+
+    @property
+    def classe_desejada(self) -> np.ndarray:
+        return self._campos['classe_desejada']
+
+    @property
+    def pureza_original(self) -> np.ndarray:
+        return self._campos['pureza_original']
+
+    @property
+    def pureza_modificada(self) -> np.ndarray:
+        return self._campos['pureza_modificada']
+
+    @property
+    def epsilon(self) -> np.ndarray:
+        return self._campos['epsilon']
+
+    @property
+    def tempo(self) -> np.ndarray:
+        return self._campos['tempo']
+
+    @property
+    def num_amostras(self) -> np.ndarray:
+        return self._campos['num_amostras']
+
+    @property
+    def classe_original(self) -> np.ndarray:
+        return self.original[:, -1]
+
+    @property
+    def classe_modificada(self) -> np.ndarray:
+        return self.modificada[:, -1]
+
+    def validade(self) -> np.ndarray:
+        """Se a classe modificada é a classe desejada, como em `Validity`. É False se não há explicação."""
+        return self.classe_modificada == self.classe_desejada
+
+    def dispersao(self) -> np.ndarray:
+        """
+        Quantidade de features alteradas em cada explicação, como em `Dispersao`. Uma feature categórica é alterada se
+        alguma das suas colunas codificadas for alterada. É NaN se não há explicação.
+        """
+        grupos = self._grupos[:-1]
+        codigos, unicos = pd.factorize(grupos)
+        pertence = np.zeros((len(grupos), len(unicos)))
+        pertence[np.arange(len(grupos)), codigos] = 1
+        alterado = self.original[:, :-1] != self.modificada[:, :-1]
+        dispersao = ((alterado @ pertence) > 0).sum(axis=1).astype(float)
+        dispersao[~self.encontrado] = np.nan
+        return dispersao
+
+    def proximidade(self) -> np.ndarray:
+        """
+        Distância euclidiana entre as instâncias original e modificada, com as colunas categóricas multiplicadas por
+        sqrt(.5), como em `MetricCategorical`. É NaN se não há explicação.
+        """
+        pesos = np.where(self._colunas.isin(self._colunas_categoricas), np.sqrt(.5), 1.)
+        return np.linalg.norm((self.modificada - self.original) * pesos, axis=1)
+
+    def distancias_carla(self) -> Dict[str, np.ndarray]:
+        """Distâncias de `CARLADistances` para todas as explicações. São NaN se não há explicação."""
+        delta = self.modificada - self.original
+        distancias = {
+            'Distance_1': np.sum(delta != 0, axis=1),
+            'Distance_2': np.sum(np.abs(delta), axis=1),
+            'Distance_3': np.sum(np.square(delta), axis=1),
+            'Distance_4': np.max(np.abs(delta), axis=1),
+        }
+        return {distancia: np.where(self.encontrado, valores, np.nan) for distancia, valores in distancias.items()}
@@ -5,6 +5,7 @@ import numpy as np
 import pandas as pd
 from kaog import KAOG
 from kaog.distancias import Distancias
+from scipy.spatial.distance import cdist
 from sklearn.manifold import TSNE
 from sklearn.neighbors import NearestNeighbors
 
@@ -36,6 +37,8 @@ class KAOGAdaptado(KAOG):
 
 
 class NovaDistancia(Distancias):
+    # Até esta quantidade de instâncias, as distâncias são calculadas com uma matriz densa ao invés da ball tree
+    LIMITE_DENSO = 2000
 
     def __init__(self, dataset: DatasetAbstract):
         """
@@ -52,14 +55,34 @@ class NovaDistancia(Distancias):
         k = data.shape[0]
         logging.debug('Calculando distâncias e vizinhos...')
         x = self._tratar_x(data)
-        nn = NearestNeighbors(n_neighbors=k, metric=self.METRIC, n_jobs=1, algorithm='ball_tree').fit(x)
+        if k <= self.LIMITE_DENSO and self.METRIC == 'euclidean':
+            distances, kneighbors = self._vizinhos_denso(x.to_numpy(dtype=float))
+        else:
+            nn = NearestNeighbors(n_neighbors=k, metric=self.METRIC, n_jobs=1, algorithm='ball_tree').fit(x)
 
-        # Decrementa k para considerar o próprio ponto
-        distances, kneighbors = nn.kneighbors(n_neighbors=k - 1, return_distance=True)
+            # Decrementa k para considerar o próprio ponto
+            distances, kneighbors = nn.kneighbors(n_neighbors=k - 1, return_distance=True)
         logging.debug('Distâncias calculadas.')
         self._ordenar(distances, kneighbors)
         return distances, kneighbors
 
+    @staticmethod
+    def _vizinhos_denso(x: np.ndarray) -> (np.ndarray, np.ndarray):
+        """
+        Calcula a matriz completa de distâncias euclidianas e ordena cada linha, obtendo para cada ponto todos os
+        outros pontos, do mais próximo ao mais distante, assim como `NearestNeighbors.kneighbors` sem o próprio ponto.
+
+        :param x: Dados já tratados, com uma instância por linha.
+        :type x: np.ndarray
+        :return: Distâncias e índices dos vizinhos, ambos com formato (n, n - 1).
+        :rtype: (np.ndarray, np.ndarray)
+        """
+        distancias = cdist(x, x)
+        # O próprio ponto fica por último na ordenação e é descartado
+        np.fill_diagonal(distancias, np.inf)
+        vizinhos = np.argsort(distancias, axis=1, kind='stable')[:, :-1]
+        return np.take_along_axis(distancias, vizinhos, axis=1), vizinhos
+
     def _tratar_x(self, x) -> pd.DataFrame:
         """
         Valores de x devem ser colocados no formato de encode, e em seguida, substituidos as colunas de encode com valores
@@ -0,0 +1,126 @@
+import logging
+from typing import Optional, Union
+
+import numpy as np
+import pandas as pd
+from sklearn.exceptions import NotFittedError
+
+from kaogexp.data.loader import ColunaYSingleton
+from kaogexp.data.normalizer.NormalizerAbstract import NormalizerAbstract
+from kaogexp.data.treatment.TreatmentAbstract import TreatmentAbstract
+from kaogexp.explainer.methods.Counterfactual import Counterfactual
+
+
+class CounterfactualResult:
+    """
+    Resultado compacto de um `Counterfactual`, sem o KAOG e as distâncias utilizados na busca.
+    Mantém apenas as instâncias original e modificada, as classes, as purezas e o tempo da explicação, de forma que
+    manter ou serializar muitos resultados não mantém os grafos de cada explicação.
+    """
+
+    __slots__ = ('_instancia_original', '_instancia_modificada', '_classe_desejada', 'pureza_original',
+                 'pureza_modificada', 'tratador_associado', 'normalizador_associado', 'num_amostras', 'epsilon', 'tempo')
+
+    def __init__(self, instancia_original: pd.Series, instancia_modificada: pd.Series, classe_desejada: int,
+                 pureza_original: Optional[float] = None, pureza_modificada: Optional[float] = None,
+                 tratador_associado: TreatmentAbstract = None, normalizador_associado: NormalizerAbstract = None,
+                 num_amostras: Optional[int] = None, tempo: Optional[float] = None,
+                 epsilon: Optional[Union[float, np.ndarray]] = None):
+        """
+        :param instancia_original: Instância explicada.
+        :type instancia_original: pd.Series
+        :param instancia_modificada: Instância encontrada pela busca.
+        :type instancia_modificada: pd.Series
+        :param classe_desejada: Classe buscada.
+        :type classe_desejada: int
+        :param pureza_original: Pureza do componente da instância original.
+        :type pureza_original: Optional[float]
+        :param pureza_modificada: Pureza do componente da instância modificada.
+        :type pureza_modificada: Optional[float]
+        :param tratador_associado: Tratador utilizado nos dados, necessário para algumas métricas.
+        :type tratador_associado: TreatmentAbstract
+        :param normalizador_associado: Normalizador utilizado nos dados.
+        :type normalizador_associado: NormalizerAbstract
+        :param num_amostras: Quantidade de amostras utilizadas para criar o KAOG.
+        :type num_amostras: Optional[int]
+        :param tempo: Tempo, em segundos, utilizado na explicação.
+        :type tempo: Optional[float]
+        :param epsilon: Epsilon da amostragem que gerou a explicação.
+        :type epsilon: Optional[Union[float, np.ndarray]]
+        """
+        self._instancia_original = instancia_original
+        self._instancia_modificada = instancia_modificada
+        self._classe_desejada = classe_desejada
+        self.pureza_original = pureza_original
+        self.pureza_modificada = pureza_modificada
+        self.tratador_associado = tratador_associado
+        self.normalizador_associado = normalizador_associado
+        self.num_amostras = num_amostras
+        self.tempo = tempo
+        self.epsilon = epsilon
+
+    @classmethod
+    def from_counterfactual(cls, counterfactual: Counterfactual,
+                            tempo: Optional[float] = None) -> 'CounterfactualResult':
+        """
+        Cria o resultado compacto a partir de um `Counterfactual`, calculando as purezas enquanto o KAOG ainda existe.
+
+        :param counterfactual: Explicação encontrada.
+        :type counterfactual: Counterfactual
+        :param tempo: Tempo, em segundos, utilizado na explicação.
+        :type tempo: Optional[float]
+        :return: Resultado sem referências ao KAOG.
+        :rtype: CounterfactualResult
+        """
+        return cls(counterfactual.instancia_original, counterfactual.instancia_modificada,
+                   counterfactual.classe_desejada, counterfactual.pureza_original, counterfactual.pureza_modificada,
+                   counterfactual.tratador_associado, counterfactual.normalizador_associado,
+                   counterfactual.num_amostras, tempo, counterfactual.epsilon)
+
+    @property
+    def instancia_original(self) -> pd.Series:
+        return self._instancia_original.copy()
+
+    @property
+    def instancia_modificada(self) -> pd.Series:
+        return self._instancia_modificada.copy()
+
+    @property
+    def index_buscado(self):
+        return self._instancia_original.name
+
+    @property
+    def classe_desejada(self):
+        return self._classe_desejada
+
+    @property
+    def classe_modificada(self):
+        return self._instancia_modificada.loc[ColunaYSingleton().NOME_COLUNA_Y]
+
+    @property
+    def classe_original(self):
+        return self._instancia_original.loc[ColunaYSingleton().NOME_COLUNA_Y]
+
+    def _remover_normalizacao(self, instancia: pd.Series):
+        if self.normalizador_associado is not None:
+            return self.normalizador_associado.inverse_transform(instancia)
+        raise RuntimeError("Não há normalização associada ao resultado.")
+
+    def __str__(self):
+        try:
+            instancia_original = self._remover_normalizacao(self.instancia_original)
+            instancia_modificada = self._remover_normalizacao(self.instancia_modificada)
+        except (RuntimeError, NotFittedError):
+            logging.error("Não foi possível reverter a normalização")
+            instancia_original = self.instancia_original
+            instancia_modificada = self.instancia_modificada
+
+        with pd.option_context('display.max_rows', None, 'display.max_columns', None):
+            return f"""
+Counterfactual:
+Instância original:\n{instancia_original}\n
+Instância modificada:\n{instancia_modificada}\n
+Classe desejada: {self.classe_desejada}
+Pureza original: {self.pureza_original}
+Pureza modificada: {self.pureza_modificada}
+"""
@@ -1,10 +1,16 @@
 from abc import ABC, abstractmethod
+from typing import Optional, Union
 
+import numpy as np
 import pandas as pd
 from kaog import KAOG
 
 
 class MethodAbstract(ABC):
+    # Quantidade de amostras utilizadas para criar o KAOG, definida pelo `KAOGExp`
+    num_amostras: Optional[int] = None
+    # Menor epsilon com amostragem válida, utilizado na amostragem que gerou a explicação, definido pelo `KAOGExp`
+    epsilon: Optional[Union[float, np.ndarray]] = None
 
     def __init__(self, kaog: KAOG, instancia_explicada: pd.Series, **kwargs):
         self.kaog = kaog
@@ -1,8 +1,10 @@
-from copy import deepcopy
+from copy import copy
 from itertools import combinations
-from typing import List
+from typing import Iterator, List, Tuple
 
+import numpy as np
 import pandas as pd
+from pandas.api.types import is_number
 
 from kaogexp.data.loader import ColunaYSingleton
 from kaogexp.explainer.methods.Counterfactual import Counterfactual
@@ -20,55 +22,228 @@ class SparsityOptimization:
     def __init__(self, modelo: ModelAbstract, cat_cols: pd.Index):
         self.modelo = modelo
         self.cat_cols = cat_cols.copy()
-        self._instancia_original = None
 
     def optimize(self, instancia: Counterfactual):
         """
         Otimiza a instância, tentando reverter as features para o original. A otimização é aceita, se a classe for
         mantida.
+        Os candidatos são avaliados por nível, do maior para o menor número de features revertidas, com uma única
+        predição por nível. A busca termina no primeiro nível que possui um candidato válido.
 
         :param instancia: Instância a ser otimizada.
         :type instancia: MethodAbstract
         :return: Instância otimizada, podendo ser a mesma que a entrada, se não houve mudança.
         :rtype: MethodAbstract
         """
-        instancia = deepcopy(instancia)
-        self._instancia_original: pd.Series = instancia.instancia_original
-        instancia_modificada: pd.Series = instancia.instancia_modificada
-        instancia_otimizada: pd.Series = instancia_modificada.copy()
+        instancia = self._clonar(instancia)
+        nome_y = ColunaYSingleton().NOME_COLUNA_Y
 
-        # Obter pemutacoes de features
-        for item in self._permutar_features(instancia):
+        for candidatos in self._niveis_candidatos(instancia):
             # Classificar os alterados
             # se encontrar algum que permanceça na classe desejada, parar
-            classe_otimizada = self.modelo.predict(item)
-            if classe_otimizada == instancia.classe_desejada:
-                item[ColunaYSingleton().NOME_COLUNA_Y] = classe_otimizada
+            classes = np.asarray(self.modelo.predict(candidatos.drop(nome_y, axis=1, errors='ignore')))
+            validos = np.flatnonzero(classes == instancia.classe_desejada)
+            if validos.size > 0:
+                item = candidatos.iloc[validos[0]].copy()
+                item[nome_y] = classes[validos[0]]
                 instancia._instancia_modificada = item
                 break
         return instancia
 
-    def _permutar_features(self, instancia: Counterfactual):
+    @staticmethod
+    def _clonar(instancia: Counterfactual) -> Counterfactual:
+        """
+        Cria uma cópia rasa da instância, que compartilha o KAOG, as distâncias e as séries da original.
+        A otimização apenas substitui a instância modificada da cópia por uma nova série, e as séries são expostas
+        somente por cópias, então a instância recebida nunca é alterada.
+
+        :param instancia: Instância a ser copiada.
+        :type instancia: Counterfactual
+        :return: Cópia rasa de `instancia`.
+        :rtype: Counterfactual
+        """
+        return copy(instancia)
+
+    def _permutar_features(self, instancia: Counterfactual) -> Iterator[pd.Series]:
         """
         Realiza a permutação de features, revertendo as features que tiveram alguma alteração para o valor original.
 
         :param instancia: Instância que foi alterada.
-        :type instancia: pd.Series
-        :param changed: Lista com os nomes das colunas que foram alteradas.
-        :type changed: List
-        :param remaining: Lista com os nomes das colunas que não foram alteradas ainda.
-        :type remaining: List
-        :return: Todas as possíveis permutações de features.
-        :rtype: pd.DataFrame
+        :type instancia: Counterfactual
+        :return: Todas as possíveis permutações de features, uma de cada vez.
+        :rtype: Iterator[pd.Series]
+        """
+        for candidatos in self._niveis_candidatos(instancia):
+            for _, item in candidatos.iterrows():
+                yield item
+
+    def _niveis_candidatos(self, instancia: Counterfactual) -> Iterator[pd.DataFrame]:
+        """
+        Gera os candidatos nível a nível. Cada nível contém todas as combinações com o mesmo número de features
+        revertidas para o valor original, começando pelo maior número possível.
+
+        :param instancia: Instância que foi alterada.
+        :type instancia: Counterfactual
+        :return: Para cada nível, um `pd.DataFrame` com um candidato por linha.
+        :rtype: Iterator[pd.DataFrame]
         """
         metrica = Dispersao.calcular(instancia)
         original = instancia.instancia_original
         modificada = instancia.instancia_modificada
         max_can_change = metrica - 1
+        idx_alterados = original.index[original != modificada].drop(ColunaYSingleton().NOME_COLUNA_Y,
+                                                                      errors='ignore')
         for num_alterados in range(max_can_change, 0, -1):
-            idx_alterados = original.index[original != modificada]
-            poss_idx_alterar = list(map(pd.Index, combinations(idx_alterados, num_alterados)))
-            for item in poss_idx_alterar:
-                ins = modificada.copy()
-                ins[item] = original[item]
-                yield ins.copy()
+            combinacoes = list(combinations(range(len(idx_alterados)), num_alterados))
+            # Cada linha indica quais features alteradas são revertidas no candidato
+            reverter = np.zeros((len(combinacoes), len(idx_alterados)), dtype=bool)
+            reverter[np.repeat(np.arange(len(combinacoes)), num_alterados), np.ravel(combinacoes)] = True
+            yield self._montar_candidatos(original, modificada, idx_alterados, reverter)
+
+    @staticmethod
+    def _montar_candidatos(original: pd.Series, modificada: pd.Series, idx_alterados: pd.Index,
+                           reverter: np.ndarray) -> pd.DataFrame:
+        """
+        Cria um candidato para cada linha de `reverter`, partindo de `modificada` e revertendo para o valor de
+        `original` as features marcadas.
+
+        :param original: Instância original.
+        :type original: pd.Series
+        :param modificada: Instância modificada pela busca.
+        :type modificada: pd.Series
+        :param idx_alterados: Features que foram alteradas pela busca.
+        :type idx_alterados: pd.Index
+        :param reverter: Matriz com uma linha por candidato e uma coluna para cada feature de `idx_alterados`.
+        :type reverter: np.ndarray
+        :return: Candidatos, um por linha.
+        :rtype: pd.DataFrame
+        """
+        candidatos = pd.DataFrame([modificada] * reverter.shape[0], index=[modificada.name] * reverter.shape[0])
+        for j, coluna in enumerate(idx_alterados):
+            candidatos[coluna] = candidatos[coluna].where(~reverter[:, j], original[coluna])
+        return candidatos
+
+
+class BeamSparsityOptimization(SparsityOptimization):
+    """ Redução do número de features alteradas por busca em feixe
+    A cada passo, os `largura` melhores estados são expandidos revertendo mais uma feature, e todas as expansões são
+    classificadas em uma única chamada ao modelo. Entre as expansões que mantêm a classe desejada, as melhores são as
+    mais próximas da instância original, considerando a diferença de cada feature numérica e 1 para cada feature
+    categórica ainda alterada. O custo é limitado por `max_chamadas` chamadas ao modelo, com no máximo `largura` vezes
+    o número de features alteradas candidatos em cada uma.
+    """
+
+    def __init__(self, modelo: ModelAbstract, cat_cols: pd.Index, largura: int = 3, max_chamadas: int = 10):
+        """
+        :param modelo: Modelo utilizado para classificar os candidatos.
+        :type modelo: ModelAbstract
+        :param cat_cols: Colunas categóricas do dataset.
+        :type cat_cols: pd.Index
+        :param largura: Quantidade de estados mantidos a cada passo.
+        :type largura: int
+        :param max_chamadas: Quantidade máxima de chamadas ao modelo para cada instância otimizada.
+        :type max_chamadas: int
+        """
+        super().__init__(modelo, cat_cols)
+        if largura < 1:
+            raise ValueError("Largura must be greater than 0")
+        if max_chamadas < 1:
+            raise ValueError("Max_chamadas must be greater than 0")
+        self.largura = largura
+        self.max_chamadas = max_chamadas
+
+    def optimize(self, instancia: Counterfactual):
+        """
+        Otimiza a instância, revertendo uma feature por vez enquanto a classe desejada for mantida.
+
+        :param instancia: Instância a ser otimizada.
+        :type instancia: MethodAbstract
+        :return: Instância otimizada, podendo ser a mesma que a entrada, se não houve mudança.
+        :rtype: MethodAbstract
+        """
+        instancia = self._clonar(instancia)
+        nome_y = ColunaYSingleton().NOME_COLUNA_Y
+        original = instancia.instancia_original
+        modificada = instancia.instancia_modificada
+        idx_alterados = original.index[original != modificada].drop(nome_y, errors='ignore')
+        custos = self._custos(original, modificada, idx_alterados)
+
+        # Cada estado é o conjunto de features já revertidas, sempre mantendo ao menos uma feature alterada
+        feixe: List[Tuple[int, ...]] = [()]
+        for _ in range(min(self.max_chamadas, len(idx_alterados) - 1)):
+            expansoes = self._expandir(feixe, len(idx_alterados))
+            reverter = np.zeros((len(expansoes), len(idx_alterados)), dtype=bool)
+            for linha, estado in enumerate(expansoes):
+                reverter[linha, list(estado)] = True
+            candidatos = self._montar_candidatos(original, modificada, idx_alterados, reverter)
+            classes = np.asarray(self.modelo.predict(candidatos.drop(nome_y, axis=1, errors='ignore')))
+            validos = np.flatnonzero(classes == instancia.classe_desejada)
+            if validos.size == 0:
+                break
+            # Os estados válidos têm todos o mesmo número de features revertidas, então são ordenados pela distância
+            # das features que continuam alteradas
+            distancias = (~reverter[validos]) @ custos
+            melhores = validos[np.argsort(distancias, kind='stable')]
+            item = candidatos.iloc[melhores[0]].copy()
+            item[nome_y] = classes[melhores[0]]
+            instancia._instancia_modificada = item
+            feixe = [expansoes[i] for i in melhores[:self.largura]]
+        return instancia
+
+    def _custos(self, original: pd.Series, modificada: pd.Series, idx_alterados: pd.Index) -> np.ndarray:
+        """
+        Contribuição de cada feature alterada para a distância até a instância original: o quadrado da diferença
+        para features numéricas e 1 para features categóricas ou com valores que não são números.
+
+        :param original: Instância original.
+        :type original: pd.Series
+        :param modificada: Instância modificada pela busca.
+        :type modificada: pd.Series
+        :param idx_alterados: Features que foram alteradas pela busca.
+        :type idx_alterados: pd.Index
+        :return: Custo de cada feature de `idx_alterados`.
+        :rtype: np.ndarray
+        """
+        custos = np.ones(len(idx_alterados))
+        for j, coluna in enumerate(idx_alterados):
+            if coluna in self.cat_cols or not (is_number(modificada[coluna]) and is_number(original[coluna])):
+                continue
+            custos[j] = (float(modificada[coluna]) - float(original[coluna])) ** 2
+        return custos
+
+    @staticmethod
+    def _expandir(feixe: List[Tuple[int, ...]], num_alterados: int) -> List[Tuple[int, ...]]:
+        """
+        Expande cada estado do feixe revertendo uma feature a mais, sem repetir estados.
+
+        :param feixe: Estados atuais, como tuplas ordenadas das posições das features revertidas.
+        :type feixe: List[Tuple[int, ...]]
+        :param num_alterados: Número de features alteradas.
+        :type num_alterados: int
+        :return: Estados expandidos, na ordem em que foram gerados.
+        :rtype: List[Tuple[int, ...]]
+        """
+        expansoes = {}
+        for estado in feixe:
+            for posicao in range(num_alterados):
+                if posicao not in estado:
+                    expansoes.setdefault(tuple(sorted(estado + (posicao,))), None)
+        return list(expansoes)
+
+
+class GreedySparsityOptimization(BeamSparsityOptimization):
+    """ Redução do número de features alteradas por eliminação regressiva gulosa
+    Equivale à busca em feixe com largura 1: a cada passo é revertida, entre as features que mantêm a classe desejada,
+    a que deixa a instância mais próxima da original.
+    """
+
+    def __init__(self, modelo: ModelAbstract, cat_cols: pd.Index, max_chamadas: int = 10):
+        """
+        :param modelo: Modelo utilizado para classificar os candidatos.
+        :type modelo: ModelAbstract
+        :param cat_cols: Colunas categóricas do dataset.
+        :type cat_cols: pd.Index
+        :param max_chamadas: Quantidade máxima de chamadas ao modelo para cada instância otimizada.
+        :type max_chamadas: int
+        """
+        super().__init__(modelo, cat_cols, largura=1, max_chamadas=max_chamadas)
@@ -0,0 +1,54 @@
+"""
+Funções executadas pelos processos do pool utilizado em `KAOGExp.explicar_iter`.
+
+O explicador, o método e seus parâmetros são enviados para cada processo apenas uma vez, pelo `initializer` do pool,
+e ficam armazenados em variáveis globais do processo. Cada tarefa recebe somente as linhas a serem explicadas.
+"""
+from typing import Optional, Tuple, Type
+
+import pandas as pd
+
+from kaogexp.data.loader import ColunaYSingleton
+from kaogexp.explainer.methods.MethodAbstract import MethodAbstract
+
+_explicador = None
+_metodo: Optional[Type[MethodAbstract]] = None
+_kwargs: dict = {}
+_total: Optional[int] = None
+
+
+def inicializar_worker(explicador, metodo: Type[MethodAbstract], kwargs: dict, total: int,
+                       nome_coluna_y: str) -> None:
+    """
+    Armazena o estado compartilhado, somente leitura, no processo que está sendo iniciado.
+
+    :param explicador: Objeto `KAOGExp` que será utilizado pelo processo.
+    :param metodo: Método a ser utilizado para explicar as instâncias.
+    :type metodo: Type[MethodAbstract]
+    :param kwargs: Parâmetros adicionais para o método passado.
+    :type kwargs: dict
+    :param total: Quantidade total de instâncias sendo explicadas, utilizada apenas no log.
+    :type total: int
+    :param nome_coluna_y: Nome da coluna de classe, que precisa ser definido novamente em processos que não são
+    criados por `fork`.
+    :type nome_coluna_y: str
+    """
+    global _explicador, _metodo, _kwargs, _total
+    ColunaYSingleton().NOME_COLUNA_Y = nome_coluna_y
+    _explicador = explicador
+    _metodo = metodo
+    _kwargs = kwargs
+    _total = total
+
+
+def explicar_lote(tarefa: Tuple[int, pd.DataFrame]) -> Tuple[Optional[MethodAbstract], ...]:
+    """
+    Explica um lote de instâncias utilizando o estado definido em `inicializar_worker`.
+
+    :param tarefa: Posição da primeira linha do lote no conjunto completo e o lote a ser explicado.
+    :type tarefa: Tuple[int, pd.DataFrame]
+    :return: Explicações do lote, na mesma ordem das linhas.
+    :rtype: Tuple[Optional[MethodAbstract], ...]
+    """
+    index_inicial, instancias = tarefa
+    return _explicador._explicar_lote(instancias, _metodo, index_inicial=index_inicial, total=_total, **_kwargs)
@@ -1,13 +1,16 @@
+from typing import Union
+
 import numpy as np
 
 from kaogexp.explainer.methods.Counterfactual import Counterfactual
+from kaogexp.explainer.methods.CounterfactualResult import CounterfactualResult
 
 
 class CARLADistances:
 
     @staticmethod
-    def calcular(instancia: Counterfactual):
-        if not isinstance(instancia, Counterfactual):
+    def calcular(instancia: Union[Counterfactual, CounterfactualResult]):
+        if not isinstance(instancia, (Counterfactual, CounterfactualResult)):
             return None
 
         results = {}
@@ -1,13 +1,12 @@
 import logging
 import os
 from os.path import join
-from typing import Union
+from typing import Dict, Optional, Tuple, Union
 
 import numpy as np
 import pandas as pd
 import requests
 import torch
-from torch import Tensor
 
 from kaogexp.data.loader import ColunaYSingleton
 from kaogexp.data.treatment.TreatmentAbstract import TreatmentAbstract
@@ -70,8 +69,26 @@ class ANN(ModelAbstract):
         ])
     }
 
-    def __init__(self, tratador: TreatmentAbstract, name: str = 'adult'):
+    FORMATO_BRUTO = 'bruto'
+    FORMATO_CODIFICADO = 'codificado'
+
+    def __init__(self, tratador: TreatmentAbstract, name: str = 'adult', formato_entrada: Optional[str] = None):
+        """
+        :param tratador: Treatment used to encode raw data.
+        :type tratador: TreatmentAbstract
+        :param name: Dataset of the pretrained model.
+        :type name: str
+        :param formato_entrada: `FORMATO_BRUTO` or `FORMATO_CODIFICADO` to accept only data in that format. If None,
+        the format is detected from the columns of the data.
+        :type formato_entrada: Optional[str]
+        """
+        if formato_entrada not in (None, self.FORMATO_BRUTO, self.FORMATO_CODIFICADO):
+            raise ValueError(f'Invalid input format: {formato_entrada}')
         self.dataset_name = name
+        self.formato_entrada = formato_entrada
+        # Input format and positions of the model columns for each set of columns already received
+        self._formatos: Dict[Tuple, str] = {}
+        self._posicoes_colunas: Dict[Tuple, np.ndarray] = {}
         raw_model = self._get_model(name)
         super().__init__(raw_model, tratador)
 
@@ -118,53 +135,74 @@ class ANN(ModelAbstract):
             return ANN._retrieve_model(name)
 
     def predict(self, x: Union[pd.Series, pd.DataFrame]) -> Union[int, np.ndarray]:
-        x = x.copy()
-        if isinstance(x, pd.Series):
-            x = x.drop(ColunaYSingleton().NOME_COLUNA_Y, errors='ignore')
-            return self._predict_series(x)
-        elif isinstance(x, pd.DataFrame):
-            x = x.drop(ColunaYSingleton().NOME_COLUNA_Y, axis=1, errors='ignore')
-            return self._predict_dataframe(x)
-        raise RuntimeError('x must be a pandas.Series or pandas.DataFrame')
+        predicao = self._saida(x)[:, 1].round()
+        return predicao[0] if isinstance(x, pd.Series) else predicao
 
     def prob(self, x: Union[pd.Series, pd.DataFrame]) -> Union[int, np.ndarray]:
-        x = x.copy()
+        prob = self._saida(x)[:, 1]
+        return prob[0] if isinstance(x, pd.Series) else prob
+
+    def _saida(self, x: Union[pd.Series, pd.DataFrame]) -> np.ndarray:
+        """Network output for `x`, raw or encoded, with one row per instance."""
+        if not isinstance(x, (pd.Series, pd.DataFrame)):
+            raise RuntimeError('x must be a pandas.Series or pandas.DataFrame')
+        matriz = self._matriz(x)
+        with torch.inference_mode():
+            return self.raw_model(torch.from_numpy(matriz)).numpy()
+
+    def _matriz(self, x: Union[pd.Series, pd.DataFrame]) -> np.ndarray:
+        """
+        Input matrix of the network, with the columns in `feature_order`. Raw data is encoded by `tratador` first.
+        The target column, if present, is ignored.
+        """
+        if self._formato(x) == self.FORMATO_BRUTO:
+            x = self.tratador.encode(x)
+        posicoes = self._posicoes(self._colunas(x))
+        # Only the model columns are cast, so other columns, such as the target, may have any type
         if isinstance(x, pd.Series):
-            x = x.drop(ColunaYSingleton().NOME_COLUNA_Y, errors='ignore')
-            return self._prob_series(x)
-        elif isinstance(x, pd.DataFrame):
-            x = x.drop(ColunaYSingleton().NOME_COLUNA_Y, axis=1, errors='ignore')
-            return self._prob_dataframe(x)
-        raise RuntimeError('x must be a pandas.Series or pandas.DataFrame')
-
-    def _predict_dataframe(self, x: pd.DataFrame, ):
-        try:
-            tensor = self._get_tensor(x)
-            return self.raw_model(tensor)[:, 1].reshape((-1, 1)).round().detach().numpy().reshape(1, -1)[0]
-        except (ValueError, KeyError):
-            self.logger.debug('Applying treatment to dataframe.')
-            return self._predict_dataframe(self.tratador.encode(x))
-
-    def _get_tensor(self, x: pd.DataFrame) -> Tensor:
-        x = x[self.feature_order[self.dataset_name]]
-        tensor = torch.from_numpy(x.to_numpy(dtype=float))
-        tensor = tensor.float()
-        return tensor
-
-    def _predict_series(self, row: pd.Series):
-        df = pd.DataFrame([row])
-        return self._predict_dataframe(df)[0]
-        # return self.raw_model(tensor)[:, 1].reshape(-1, 1)
-
-    def _prob_series(self, x: pd.Series):
-        df = pd.DataFrame([x])
-        return self._prob_dataframe(df)[0]
-
-    def _prob_dataframe(self, x: pd.DataFrame):
-        try:
-            tensor = self._get_tensor(x)
-            predict = self.raw_model(tensor)
-            return predict[:, 1].detach().numpy()
-        except (ValueError, KeyError):
-            self.logger.debug('Applying treatment to dataframe.')
-            return self._prob_dataframe(self.tratador.encode(x))
+            return x.to_numpy()[posicoes].astype(np.float32)[np.newaxis, :]
+        return np.ascontiguousarray(x.iloc[:, posicoes].to_numpy(dtype=np.float32))
+
+    def _formato(self, x: Union[pd.Series, pd.DataFrame]) -> str:
+        """
+        Input format of `x`, decided by its columns and checked only once for each set of columns. The data is
+        encoded if it has every column in `feature_order`, and raw if it has every original column of `tratador`.
+
+        :raise ValueError: If the columns match neither format, or do not match `formato_entrada`.
+        """
+        chave = tuple(self._colunas(x))
+        formato = self._formatos.get(chave)
+        if formato is None:
+            colunas = self._colunas(x)
+            originais = self.tratador.nomes_colunas_originais.drop(ColunaYSingleton().NOME_COLUNA_Y, errors='ignore') \
+                if self.tratador is not None else None
+            if self.feature_order[self.dataset_name].isin(colunas).all():
+                formato = self.FORMATO_CODIFICADO
+            elif originais is not None and originais.isin(colunas).all():
+                formato = self.FORMATO_BRUTO
+            else:
+                raise ValueError(f'Columns {list(colunas)} are neither the raw nor the encoded features of the model.')
+            if self.formato_entrada is not None and formato != self.formato_entrada:
+                raise ValueError(f'Expected {self.formato_entrada} input, got {formato} columns.')
+            self._formatos[chave] = formato
+        return formato
+
+    def _posicoes(self, colunas: pd.Index) -> np.ndarray:
+        """
+        Positions in `colunas` of each column in `feature_order`, computed once for each set of columns.
+
+        :raise ValueError: If a column in `feature_order` is missing from `colunas`.
+        """
+        chave = tuple(colunas)
+        posicoes = self._posicoes_colunas.get(chave)
+        if posicoes is None:
+            features = self.feature_order[self.dataset_name]
+            posicoes = colunas.get_indexer(features)
+            if (posicoes < 0).any():
+                raise ValueError(f'Missing model columns: {list(features[posicoes < 0])}.')
+            self._posicoes_colunas[chave] = posicoes
+        return posicoes
+
+    @staticmethod
+    def _colunas(x: Union[pd.Series, pd.DataFrame]) -> pd.Index:
+        return x.index if isinstance(x, pd.Series) else x.columns
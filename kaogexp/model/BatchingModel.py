@@ -0,0 +1,147 @@
+import threading
+import time
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from kaogexp.data.loader import ColunaYSingleton
+from kaogexp.model.ModelAbstract import ModelAbstract
+
+
+class _Pedido:
+    """Uma chamada a `predict` ou `prob` aguardando o resultado do seu lote."""
+
+    __slots__ = ('x', 'evento', 'resultado', 'erro')
+
+    def __init__(self, x: pd.DataFrame):
+        self.x = x
+        self.evento = threading.Event()
+        self.resultado: Optional[np.ndarray] = None
+        self.erro: Optional[BaseException] = None
+
+
+class BatchingModel(ModelAbstract):
+    """
+    Agrupa chamadas simultâneas a `predict` e `prob` de outro modelo em uma única chamada.
+    A primeira chamada de um lote espera até `janela` segundos, ou até que o lote tenha `tamanho_maximo` linhas, pelas
+    chamadas de outras threads com as mesmas colunas. Em seguida, todas as linhas são classificadas de uma vez e cada
+    chamada recebe apenas os seus resultados. Se nenhuma outra chamada estiver em andamento, como em um uso com uma
+    única thread, o lote é enviado sem esperar a janela. Chamadas com pelo menos `tamanho_maximo` linhas são repassadas
+    diretamente ao modelo.
+    """
+
+    def __init__(self, modelo: ModelAbstract, janela: float = .002, tamanho_maximo: int = 1024):
+        """
+        :param modelo: Modelo que realiza as predições.
+        :type modelo: ModelAbstract
+        :param janela: Tempo máximo, em segundos, que a primeira chamada de um lote espera por outras chamadas.
+        :type janela: float
+        :param tamanho_maximo: Quantidade de linhas a partir da qual o lote é enviado sem esperar o fim da janela.
+        :type tamanho_maximo: int
+        :raise ValueError: Se `janela` for negativa ou `tamanho_maximo` não for positivo.
+        """
+        if janela < 0:
+            raise ValueError('Latency window must not be negative')
+        if tamanho_maximo < 1:
+            raise ValueError('Maximum batch size must be positive')
+        super().__init__(modelo.raw_model, modelo.tratador)
+        self.modelo = modelo
+        self.janela = janela
+        self.tamanho_maximo = tamanho_maximo
+        self._condicao = threading.Condition()
+        # Pedidos aguardando, por método e colunas
+        self._pendentes: Dict[Tuple, List[_Pedido]] = {}
+        # Chamadas em andamento, aguardando ou executando um lote
+        self._ativos = 0
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_condicao']
+        state['_pendentes'] = {}
+        state['_ativos'] = 0
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._condicao = threading.Condition()
+
+    def encode(self, x: Union[pd.Series, pd.DataFrame]) -> Union[pd.Series, pd.DataFrame]:
+        return self.modelo.encode(x)
+
+    def predict(self, x: Union[pd.Series, pd.DataFrame]) -> Union[int, np.ndarray]:
+        return self._chamar('predict', x)
+
+    def prob(self, x: Union[pd.Series, pd.DataFrame]) -> Union[int, np.ndarray]:
+        return self._chamar('prob', x)
+
+    def _chamar(self, metodo: str, x: Union[pd.Series, pd.DataFrame]) -> Union[int, np.ndarray]:
+        if isinstance(x, pd.Series):
+            return self._chamar(metodo, pd.DataFrame([x]))[0]
+        if not isinstance(x, pd.DataFrame):
+            raise TypeError(f'x must be a pandas.Series or pandas.DataFrame. Got {type(x)}.')
+        x = x.drop(ColunaYSingleton().NOME_COLUNA_Y, axis=1, errors='ignore')
+        if x.shape[0] >= self.tamanho_maximo:
+            return getattr(self.modelo, metodo)(x)
+
+        pedido = _Pedido(x)
+        chave = (metodo, tuple(x.columns))
+        with self._condicao:
+            self._ativos += 1
+            fila = self._pendentes.setdefault(chave, [])
+            fila.append(pedido)
+            lider = len(fila) == 1
+            # Sem outras chamadas em andamento, não há quem possa se juntar ao lote durante a janela
+            sozinho = self._ativos == 1
+            if not lider and self._linhas(fila) >= self.tamanho_maximo:
+                self._condicao.notify_all()
+        try:
+            if lider:
+                self._executar(metodo, self._aguardar_lote(chave, 0. if sozinho else self.janela))
+
+            pedido.evento.wait()
+        finally:
+            with self._condicao:
+                self._ativos -= 1
+        if pedido.erro is not None:
+            raise pedido.erro
+        return pedido.resultado
+
+    def _aguardar_lote(self, chave: Tuple, janela: float) -> List[_Pedido]:
+        """Espera por `janela` segundos ou pelo tamanho máximo e remove o lote de `chave` dos pedidos pendentes."""
+        prazo = time.monotonic() + janela
+        with self._condicao:
+            while self._linhas(self._pendentes[chave]) < self.tamanho_maximo:
+                restante = prazo - time.monotonic()
+                if restante <= 0:
+                    break
+                self._condicao.wait(restante)
+            return self._pendentes.pop(chave)
+
+    def _executar(self, metodo: str, lote: List[_Pedido]) -> None:
+        """Classifica os pedidos em partes de até `tamanho_maximo` linhas e entrega os resultados a cada um."""
+        inicio = 0
+        while inicio < len(lote):
+            fim = inicio + 1
+            linhas = lote[inicio].x.shape[0]
+            while fim < len(lote) and linhas + lote[fim].x.shape[0] <= self.tamanho_maximo:
+                linhas += lote[fim].x.shape[0]
+                fim += 1
+            parte = lote[inicio:fim]
+            try:
+                x = pd.concat([pedido.x for pedido in parte], ignore_index=True)
+                resultado = np.asarray(getattr(self.modelo, metodo)(x))
+                limites = np.cumsum([pedido.x.shape[0] for pedido in parte])[:-1]
+                for pedido, resultado_pedido in zip(parte, np.split(resultado, limites)):
+                    pedido.resultado = resultado_pedido
+            except Exception as e:
+                for pedido in parte:
+                    pedido.erro = e
+            finally:
+                for pedido in parte:
+                    pedido.evento.set()
+            inicio = fim
+
+    @staticmethod
+    def _linhas(fila: List[_Pedido]) -> int:
+        return sum(pedido.x.shape[0] for pedido in fila)
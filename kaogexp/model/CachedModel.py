@@ -0,0 +1,117 @@
+import threading
+from collections import OrderedDict
+from typing import List, Union
+
+import numpy as np
+import pandas as pd
+
+from kaogexp.data.loader import ColunaYSingleton
+from kaogexp.model.ModelAbstract import ModelAbstract
+
+
+class CachedModel(ModelAbstract):
+    """
+    Mantém em cache os resultados de `predict` e `prob` de outro modelo para as linhas já classificadas.
+    Cada linha é codificada pelo tratador e identificada pelos bytes dos seus valores. Em uma chamada com várias linhas,
+    as linhas repetidas são classificadas apenas uma vez e somente as que não estão no cache são enviadas ao modelo.
+    O cache é LRU, limitado a `tamanho_cache` linhas por método.
+    `cache_hits` e `cache_misses` contam as linhas distintas de cada chamada encontradas ou não no cache, enquanto
+    `linhas_repetidas` conta as linhas que apenas repetem outra linha da mesma chamada.
+    """
+
+    def __init__(self, modelo: ModelAbstract, tamanho_cache: int = 100000):
+        """
+        :param modelo: Modelo que realiza as predições.
+        :type modelo: ModelAbstract
+        :param tamanho_cache: Quantidade máxima de linhas mantidas no cache de cada método.
+        :type tamanho_cache: int
+        :raise ValueError: Se `tamanho_cache` não for positivo.
+        """
+        if tamanho_cache < 1:
+            raise ValueError('Cache size must be positive')
+        super().__init__(modelo.raw_model, modelo.tratador)
+        self.modelo = modelo
+        self.tamanho_cache = tamanho_cache
+        self._colunas = modelo.tratador.nomes_colunas_encoded.drop(ColunaYSingleton().NOME_COLUNA_Y, errors='ignore')
+        self._cache = {'predict': OrderedDict(), 'prob': OrderedDict()}
+        self._lock = threading.Lock()
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.linhas_repetidas = 0
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_lock']
+        state['_cache'] = {metodo: OrderedDict() for metodo in self._cache}
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    @property
+    def taxa_acerto(self) -> float:
+        """Proporção das linhas distintas de cada chamada respondidas pelo cache."""
+        total = self.cache_hits + self.cache_misses
+        return self.cache_hits / total if total else 0.
+
+    def clear_cache(self) -> None:
+        """Remove todos os resultados do cache e zera os contadores."""
+        with self._lock:
+            for cache in self._cache.values():
+                cache.clear()
+            self.cache_hits = 0
+            self.cache_misses = 0
+            self.linhas_repetidas = 0
+
+    def encode(self, x: Union[pd.Series, pd.DataFrame]) -> Union[pd.Series, pd.DataFrame]:
+        return self.modelo.encode(x)
+
+    def predict(self, x: Union[pd.Series, pd.DataFrame]) -> Union[int, np.ndarray]:
+        return self._chamar('predict', x)
+
+    def prob(self, x: Union[pd.Series, pd.DataFrame]) -> Union[int, np.ndarray]:
+        return self._chamar('prob', x)
+
+    def _chamar(self, metodo: str, x: Union[pd.Series, pd.DataFrame]) -> Union[int, np.ndarray]:
+        if isinstance(x, pd.Series):
+            return self._chamar(metodo, pd.DataFrame([x]))[0]
+        if not isinstance(x, pd.DataFrame):
+            raise TypeError(f'x must be a pandas.Series or pandas.DataFrame. Got {type(x)}.')
+
+        encoded = self._codificar(x)
+        # Cada linha vira um único valor com os seus bytes, permitindo remover as linhas repetidas de uma vez
+        linhas = encoded.view(np.dtype((np.void, encoded.dtype.itemsize * encoded.shape[1]))).ravel()
+        unicas, posicoes, inversa = np.unique(linhas, return_index=True, return_inverse=True)
+        chaves = [linha.tobytes() for linha in unicas]
+
+        cache = self._cache[metodo]
+        resultados: List = [None] * len(chaves)
+        with self._lock:
+            for i, chave in enumerate(chaves):
+                if chave in cache:
+                    cache.move_to_end(chave)
+                    resultados[i] = cache[chave]
+        faltantes = [i for i, resultado in enumerate(resultados) if resultado is None]
+
+        if faltantes:
+            novos = getattr(self.modelo, metodo)(
+                pd.DataFrame(encoded[posicoes[faltantes]], columns=self._colunas))
+            with self._lock:
+                for i, resultado in zip(faltantes, np.asarray(novos)):
+                    resultados[i] = resultado
+                    cache[chaves[i]] = resultado
+                while len(cache) > self.tamanho_cache:
+                    cache.popitem(last=False)
+        with self._lock:
+            self.cache_hits += len(chaves) - len(faltantes)
+            self.cache_misses += len(faltantes)
+            self.linhas_repetidas += x.shape[0] - len(chaves)
+        return np.asarray(resultados)[inversa.ravel()]
+
+    def _codificar(self, x: pd.DataFrame) -> np.ndarray:
+        """Codifica `x`, se necessário, em um array contíguo com as colunas na ordem do tratador."""
+        x = x.drop(ColunaYSingleton().NOME_COLUNA_Y, axis=1, errors='ignore')
+        if not self._colunas.difference(x.columns).empty:
+            x = self.tratador.encode(x)
+        return np.ascontiguousarray(x[self._colunas].to_numpy(dtype=float))
@@ -9,12 +9,14 @@ import pandas as pd
 
 from kaogexp.data.loader import ColunaYSingleton
 from kaogexp.model.ANN import ANN
-from main.carla_runs.util import save_tratador_and_normalizador, compute_and_save_metrics, save_counterfactuals
+from main.carla_runs.util import save_tratador_and_normalizador, compute_and_save_metrics, save_counterfactuals, \
+    save_results_table
 
 ColunaYSingleton().NOME_COLUNA_Y = 'income'
 
 from kaogexp.data.loader.DatasetFromMemory import DatasetFromMemory
 from kaogexp.data.sampler.LatinSampler import LatinSampler
+from kaogexp.explainer.ArmazenamentoExplicacoes import ArmazenamentoExplicacoes
 from kaogexp.explainer.KAOGExp import KAOGExp
 from kaogexp.explainer.methods.Counterfactual import Counterfactual
 
@@ -54,15 +56,22 @@ working_dir = os.path.dirname(__file__)
 save_tratador_and_normalizador(working_dir, name, tratador_associado, normalizador_associado)
 
 print('Realizando explicacao...')
-threads = []
 threads_num = multiprocessing.cpu_count()
+# Cada explicação concluída é gravada em disco; ao executar novamente, as instâncias já explicadas são puladas
+armazenamento = ArmazenamentoExplicacoes(os.path.join(working_dir, 'checkpoints', name))
+
+
+# O estado de cada explicação fica em um contexto próprio, então o mesmo explicador atende todas as threads
+explicador = KAOGExp(train_data, model, sampler, fixed_cols=fixed_cols, otimizar=True, resultado_compacto=True)
 
 
 def explicar(item, i, total):
     logging.info('\n' + ('#' * 15) + f' Item {i + 1} of {total} ' + ('#' * 15) + '\n')
-    explicador = KAOGExp(train_data, model, sampler, fixed_cols=fixed_cols, otimizar=True)
-    return explicador.explicar(item, metodo=metodo, classe_desejada=classe_desejada,
-                               tratador_associado=tratador_associado, normalizador_associado=normalizador_associado)
+    explicacao = explicador.explicar(item, metodo=metodo, classe_desejada=classe_desejada,
+                                     tratador_associado=tratador_associado,
+                                     normalizador_associado=normalizador_associado)
+    armazenamento.adicionar(item.name, explicacao)
+    return explicacao
 
 
 # Quantidade de instâncias que serão explicadas do conjunto de testes
@@ -70,13 +79,17 @@ NUM_SAMPLE_DATASET = 100
 test_dataset = test_data.dataset().sample(NUM_SAMPLE_DATASET, random_state=seed)
 with ThreadPoolExecutor(max_workers=threads_num) as executor:
     total = len(test_dataset)
-    for i, (idx, row) in enumerate(test_dataset.iterrows()):
-        threads.append(executor.submit(explicar, row, i, total))
+    threads = [executor.submit(explicar, row, i, total) for i, (idx, row) in enumerate(test_dataset.iterrows())
+               if idx not in armazenamento]
+for th in threads:
+    th.result()
 
-explicacoes = tuple(map(lambda th: th.result(), threads))
+explicacoes = tuple(armazenamento.obter(idx) for idx in test_dataset.index)
+armazenamento.fechar()
 
 # %%
 save_counterfactuals(name, working_dir, explicacoes)
+save_results_table(name, working_dir, test_dataset.index, explicacoes, tratador_associado)
 
 # %%
 # Métricas
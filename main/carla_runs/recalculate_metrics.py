@@ -7,7 +7,8 @@ import pandas as pd
 
 from data.loader import ColunaYSingleton
 from data.loader.DatasetFromMemory import DatasetFromMemory
-from main.carla_runs.util import compute_and_save_metrics
+from kaogexp.explainer.TabelaResultados import TabelaResultados
+from main.carla_runs.util import compute_and_save_metrics, compute_and_save_table_metrics
 
 working_dir = os.path.dirname(__file__)
 
@@ -35,6 +36,12 @@ def main():
 
     for dataset_name in datasets_names:
         logger.info(f'Calculating metrics for {dataset_name}')
+        table_path = os.path.join(working_dir, dataset_name, 'tables', dataset_name)
+        if os.path.exists(os.path.join(table_path, TabelaResultados.ARQUIVO_META)):
+            # The columnar table avoids unpickling every explanation
+            compute_and_save_table_metrics(dataset_name, os.path.join(working_dir, dataset_name),
+                                           TabelaResultados(table_path))
+            continue
         try:
             explicacoes = []
             # load pickle
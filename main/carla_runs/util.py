@@ -4,8 +4,10 @@ import operator
 import os
 import pickle
 
+import numpy as np
 import pandas as pd
 
+from kaogexp.explainer.TabelaResultados import TabelaResultados
 from metrics.CERScore import CERScore
 from metrics.carla_metrics import CARLADistances
 from metrics.dispersao import Dispersao
@@ -32,6 +34,49 @@ def save_counterfactuals(name, working_dir, explicacoes):
                 print('Empty')
 
 
+def save_results_table(name, working_dir, index, explicacoes, tratador):
+    """Save the explanations as a columnar table, read by `compute_and_save_table_metrics`."""
+    return TabelaResultados.escrever(os.path.join(working_dir, 'tables', name), zip(index, explicacoes), tratador)
+
+
+def compute_and_save_table_metrics(name, working_dir, tabela):
+    """Same metrics as `compute_and_save_metrics`, computed over the columns of a `TabelaResultados`."""
+    logging.info("Computing metrics from table")
+
+    def to_list(values):
+        return [None if np.isnan(value) else float(value) for value in values]
+
+    proximidades = tabela.proximidade()
+    carla_distances = tabela.distancias_carla()
+    encontrados = int(tabela.encontrado.sum())
+    metricas_dict = {
+        'validade': {
+            'proporcao_validade': float(np.mean(tabela.validade())),
+        },
+        'dispersao': to_list(tabela.dispersao()),
+        'proximidade': {
+            'media_proximidade': pd.Series(proximidades).describe().to_dict(),
+            'proximidades': to_list(proximidades)
+        },
+        # As in compute_and_save_metrics, explanations not found count as zero in the custom distance mean, while the
+        # CARLA distances are averaged only over the explanations found
+        'cerscore': {
+            'custom_distance': float(np.nansum(proximidades) / len(tabela)),
+            **{distance: float(np.nansum(values) / encontrados) if encontrados else None
+               for distance, values in carla_distances.items()}
+        },
+        'carla_distances': [{distance: float(values[i]) for distance, values in carla_distances.items()}
+                            if tabela.encontrado[i] else None for i in range(len(tabela))],
+    }
+
+    result_path = os.path.join(working_dir, f'metricas_{name}.json')
+    logging.info(f"Saving metrics to {result_path}")
+    with open(result_path, 'w') as f:
+        json.dump(metricas_dict, f, indent=4)
+
+    logging.info("Metrics saved")
+
+
 def compute_and_save_metrics(name, working_dir, test_dataset, test_data, explicacoes):
     logging.info("Computing metrics")
     logging.basicConfig(level=logging.INFO)
@@ -72,6 +72,51 @@ class TestANN(TestCase):
         df = df[df['income'] == 1].iloc[:2]
         x = df.drop(ColunaYSingleton().NOME_COLUNA_Y, axis=1)
 
+    def test_predict_raw_dataframe(self):
+        dataset = self._get_dateset()
+        raw = dataset.x(True, False).iloc[:10]
+        encoded = dataset.x(True, True).iloc[:10]
+        instance = ANN(dataset.tratador)
+
+        result = instance.prob(raw)
+
+        self.assertTrue((result == instance.prob(encoded)).all())
+
+    def test_predict_raw_dataframe_with_target(self):
+        dataset = self._get_dateset()
+        raw = dataset.dataset(True, False).iloc[:5].copy()
+        raw[ColunaYSingleton().NOME_COLUNA_Y] = raw[ColunaYSingleton().NOME_COLUNA_Y].map({0: '<=50K', 1: '>50K'})
+        encoded = dataset.x(True, True).iloc[:5]
+        instance = ANN(dataset.tratador)
+
+        result = instance.prob(raw)
+
+        self.assertTrue((result == instance.prob(encoded)).all())
+
+    def test_predict_invalid_columns(self):
+        dataset = self._get_dateset()
+        x = dataset.x(True, True).iloc[:2].drop('age', axis=1)
+        instance = ANN(dataset.tratador)
+
+        with self.assertRaises(ValueError):
+            instance.predict(x)
+
+    def test_posicoes_missing_column(self):
+        dataset = self._get_dateset()
+        instance = ANN(dataset.tratador)
+        colunas = ANN.feature_order['adult'].drop('age').append(pd.Index([ColunaYSingleton().NOME_COLUNA_Y]))
+
+        with self.assertRaises(ValueError):
+            instance._posicoes(colunas)
+
+    def test_predict_unexpected_format(self):
+        dataset = self._get_dateset()
+        x = dataset.x(True, False).iloc[:2]
+        instance = ANN(dataset.tratador, formato_entrada=ANN.FORMATO_CODIFICADO)
+
+        with self.assertRaises(ValueError):
+            instance.predict(x)
+
     def _get_dateset(self):
         index = ['age', 'workclass', 'fnlwgt', 'education-num', 'marital-status', 'occupation', 'relationship',
                  'race', 'sex', 'capital-gain', 'capital-loss', 'hours-per-week', 'native-country']
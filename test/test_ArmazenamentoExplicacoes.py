@@ -0,0 +1,59 @@
+import os
+import tempfile
+from unittest import TestCase
+
+import numpy as np
+
+from kaogexp.explainer.ArmazenamentoExplicacoes import ArmazenamentoExplicacoes
+
+
+class TestArmazenamentoExplicacoes(TestCase):
+
+    def setUp(self) -> None:
+        self.diretorio = tempfile.TemporaryDirectory()
+        self.addCleanup(self.diretorio.cleanup)
+
+    def test_adicionar_obter(self):
+        """Stored explanations must be read back by index, also after reopening the store."""
+        with ArmazenamentoExplicacoes(self.diretorio.name, sincronizar=False) as armazenamento:
+            armazenamento.adicionar(np.int64(3), {'valor': 3})
+            armazenamento.adicionar(7, None)
+            self.assertRaises(KeyError, armazenamento.adicionar, 3, {'valor': 0})
+
+        with ArmazenamentoExplicacoes(self.diretorio.name, sincronizar=False) as armazenamento:
+            self.assertEqual(2, len(armazenamento))
+            self.assertIn(3, armazenamento)
+            self.assertNotIn(5, armazenamento)
+            self.assertEqual({'valor': 3}, armazenamento.obter(3))
+            self.assertEqual([(3, {'valor': 3}), (7, None)], list(armazenamento.itens()))
+
+    def test_escrita_interrompida(self):
+        """A partially written record must be discarded when the store is reopened."""
+        with ArmazenamentoExplicacoes(self.diretorio.name, sincronizar=False) as armazenamento:
+            armazenamento.adicionar(1, 'a')
+        with open(os.path.join(self.diretorio.name, ArmazenamentoExplicacoes.ARQUIVO_DADOS), 'ab') as file:
+            file.write(b'registro incompleto')
+        with open(os.path.join(self.diretorio.name, ArmazenamentoExplicacoes.ARQUIVO_INDICE), 'ab') as file:
+            file.write(b'[2, 10')
+
+        with ArmazenamentoExplicacoes(self.diretorio.name, sincronizar=False) as armazenamento:
+            self.assertEqual([1], list(armazenamento))
+            armazenamento.adicionar(2, 'b')
+            self.assertEqual('b', armazenamento.obter(2))
+
+        with ArmazenamentoExplicacoes(self.diretorio.name, sincronizar=False) as armazenamento:
+            self.assertEqual([(1, 'a'), (2, 'b')], list(armazenamento.itens()))
+
+    def test_index_invalido(self):
+        """An index that cannot be stored must be rejected before anything is written."""
+        caminho_dados = os.path.join(self.diretorio.name, ArmazenamentoExplicacoes.ARQUIVO_DADOS)
+        with ArmazenamentoExplicacoes(self.diretorio.name, sincronizar=False) as armazenamento:
+            armazenamento.adicionar(1, 'a')
+            tamanho = os.path.getsize(caminho_dados)
+
+            self.assertRaises(TypeError, armazenamento.adicionar, object(), 'b')
+            self.assertEqual(tamanho, os.path.getsize(caminho_dados))
+            armazenamento.adicionar(2, 'c')
+
+        with ArmazenamentoExplicacoes(self.diretorio.name, sincronizar=False) as armazenamento:
+            self.assertEqual([(1, 'a'), (2, 'c')], list(armazenamento.itens()))
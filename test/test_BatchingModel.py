@@ -0,0 +1,67 @@
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import numpy as np
+
+from kaogexp.data.loader import ColunaYSingleton
+from kaogexp.model.BatchingModel import BatchingModel
+from kaogexp.model.RandomForestModel import RandomForestModel
+from util import Data
+
+
+class BatchingModelTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        ColunaYSingleton().NOME_COLUNA_Y = 'target'
+
+    def setUp(self) -> None:
+        iris = Data.create_new_instance_iris()
+        self.x = iris.x()
+        self.modelo = RandomForestModel(self.x, iris.y(), iris.tratador)
+
+    def test_predict_concorrente(self):
+        """Concurrent single-row calls must be answered with fewer model calls and the same predictions."""
+        instance = BatchingModel(self.modelo, janela=.05, tamanho_maximo=64)
+        linhas = [row for _, row in self.x.iloc[:32].iterrows()]
+        expected = self.modelo.predict(self.x.iloc[:32].copy())
+
+        with patch.object(self.modelo, 'predict', wraps=self.modelo.predict) as predict:
+            with ThreadPoolExecutor(max_workers=32) as executor:
+                result = list(executor.map(instance.predict, linhas))
+
+        np.testing.assert_array_equal(expected, result)
+        self.assertLess(predict.call_count, len(linhas))
+
+    def test_chamada_unica_sem_janela(self):
+        """A caller alone must not wait for the latency window."""
+        instance = BatchingModel(self.modelo, janela=1.)
+        linha = self.x.iloc[0]
+        self.modelo.predict(linha)
+
+        inicio = time.perf_counter()
+        for _ in range(3):
+            instance.predict(linha)
+
+        self.assertLess(time.perf_counter() - inicio, instance.janela)
+
+    def test_predict_dataframe(self):
+        """DataFrames must keep their shape, also when they skip the batching for being large."""
+        instance = BatchingModel(self.modelo, janela=0, tamanho_maximo=10)
+
+        for tamanho in (3, 20):
+            with self.subTest(tamanho=tamanho):
+                result = instance.predict(self.x.iloc[:tamanho].copy())
+                np.testing.assert_array_equal(self.modelo.predict(self.x.iloc[:tamanho].copy()), result)
+
+    def test_erro_propagado(self):
+        """Errors of the model must be raised to every caller of the batch."""
+        instance = BatchingModel(self.modelo, janela=0)
+
+        self.assertRaises(NotImplementedError, instance.prob, self.x.iloc[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
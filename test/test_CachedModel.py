@@ -0,0 +1,71 @@
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
+from kaogexp.data.loader import ColunaYSingleton
+from kaogexp.model.CachedModel import CachedModel
+from kaogexp.model.RandomForestModel import RandomForestModel
+from util import Data
+
+
+class CachedModelTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        ColunaYSingleton().NOME_COLUNA_Y = 'target'
+
+    def setUp(self) -> None:
+        adult = Data.create_new_instance_adult(num_sample=300)
+        self.x = adult.x()
+        self.modelo = RandomForestModel.from_dataset(adult)
+
+    def test_predict_cache(self):
+        """Only rows not seen before must reach the model, with the same predictions as without the cache."""
+        instance = CachedModel(self.modelo)
+        x = pd.concat([self.x.iloc[:10], self.x.iloc[:5]])
+        expected = self.modelo.predict(x.copy())
+
+        with patch.object(self.modelo, 'predict', wraps=self.modelo.predict) as predict:
+            np.testing.assert_array_equal(expected, instance.predict(x))
+            self.assertEqual(10, predict.call_args[0][0].shape[0])
+            # Encoded rows share the cache with the raw ones
+            encoded = self.modelo.encode(self.x.iloc[:10]).iloc[::-1]
+            np.testing.assert_array_equal(expected[:10][::-1], instance.predict(encoded))
+            self.assertEqual(expected[3], instance.predict(self.x.iloc[3]))
+            self.assertEqual(1, predict.call_count)
+
+        self.assertEqual(10, instance.cache_misses)
+        self.assertEqual(11, instance.cache_hits)
+        self.assertEqual(5, instance.linhas_repetidas)
+        self.assertAlmostEqual(11 / 21, instance.taxa_acerto)
+
+    def test_cache_frio_linhas_repetidas(self):
+        """Rows repeated inside a call must not be counted as hits when the cache is cold."""
+        instance = CachedModel(self.modelo)
+
+        instance.predict(pd.concat([self.x.iloc[:3]] * 4))
+
+        self.assertEqual(0, instance.cache_hits)
+        self.assertEqual(3, instance.cache_misses)
+        self.assertEqual(9, instance.linhas_repetidas)
+        self.assertEqual(0., instance.taxa_acerto)
+
+    def test_tamanho_cache(self):
+        """The cache must keep at most `tamanho_cache` rows, evicting the least recently used."""
+        instance = CachedModel(self.modelo, tamanho_cache=4)
+
+        instance.predict(self.x.iloc[:6])
+        instance.predict(self.x.iloc[[0, 5]])
+
+        self.assertEqual(4, len(instance._cache['predict']))
+        self.assertEqual(1, instance.cache_hits)
+
+        instance.clear_cache()
+        self.assertEqual(0, len(instance._cache['predict']))
+        self.assertEqual(0, instance.cache_hits + instance.cache_misses + instance.linhas_repetidas)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -161,6 +161,31 @@ class DatasetTreatmentTest(unittest.TestCase):
         pd.testing.assert_frame_equal(expected_encoded, encoded, check_dtype=False)
         pd.testing.assert_index_equal(expected_columns, encoded.columns, check_order=False)
 
+    def test_encode_order(self):
+        """Encoded columns must follow `nomes_colunas_encoded`, even if some category is missing in the input."""
+        dataset, instance = self._prepare_adult()
+        input_ = dataset.head(3)
+
+        encoded = instance.encode(input_)
+        expected = pd.get_dummies(input_.drop(ColunaYSingleton().NOME_COLUNA_Y, axis=1)).reindex(
+            columns=instance.nomes_colunas_encoded.drop(ColunaYSingleton().NOME_COLUNA_Y), fill_value=0)
+
+        pd.testing.assert_index_equal(instance.nomes_colunas_encoded, encoded.columns)
+        pd.testing.assert_frame_equal(expected, encoded.drop(ColunaYSingleton().NOME_COLUNA_Y, axis=1),
+                                      check_dtype=False)
+
+    def test_encode_array_unknown_category(self):
+        """Unknown categories must not activate any dummy column."""
+        dataset, instance = self._prepare_adult(with_y=False)
+        input_ = dataset.head(1).astype({'workclass': 'object'})
+        input_['workclass'] = 'Unknown'
+        colunas_workclass = instance.nomes_colunas_encoded.str.startswith('workclass_')
+
+        result = instance.encode_array(input_)
+
+        self.assertEqual((1, len(instance.nomes_colunas_encoded) - 1), result.shape)
+        self.assertEqual(0, result[:, colunas_workclass[:-1]].sum())
+
     ################
     # Util methods #
     ################
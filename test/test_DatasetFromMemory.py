@@ -1,5 +1,6 @@
 import unittest
 from unittest import expectedFailure
+from unittest.mock import patch
 
 import pandas as pd
 
@@ -114,6 +115,59 @@ class DatasetFromMemoryTest(unittest.TestCase):
 
         self.assertRaises(RuntimeError, instance.dataset, True, True, True)
 
+    def test_cached_views(self):
+        """Views must be computed once, copied on request and discarded when the data is replaced."""
+        instance = self.iris_instance
+        primeiro = instance.x(encoded=True, copia=True)
+        primeiro.iloc[0, 0] = -1
+
+        self.assertIs(instance._visao(True, True, False, com_y=False), instance._visao(True, True, False, com_y=False))
+        self.assertNotEqual(-1, instance.x(encoded=True).iloc[0, 0])
+
+        instance._dataset = instance._dataset.iloc[:10]
+        self.assertEqual((10, 4), instance.x().shape)
+        self.assertEqual((10,), instance.y().shape)
+
+    def test_cached_views_without_copy(self):
+        """By default, a second call must return the cached frame itself, without copying or encoding it again."""
+        instance = self.adult_instance
+        with patch.object(instance.tratador, 'encode', wraps=instance.tratador.encode) as encode, \
+                patch.object(pd.DataFrame, 'copy', autospec=True, side_effect=pd.DataFrame.copy) as copia:
+            primeiro = instance.x(encoded=True)
+            copia.reset_mock()
+            segundo = instance.x(encoded=True)
+
+            self.assertIs(primeiro, segundo)
+            self.assertIs(instance.dataset(encoded=True), instance.dataset(encoded=True))
+            self.assertEqual(1, encode.call_count)
+            copia.assert_not_called()
+
+    def test_cached_views_read_only(self):
+        """The shared cached frames must not accept writes, while their copies must."""
+        instance = self.adult_instance
+        for visao in (instance.dataset(), instance.x(encoded=True), instance.dataset(normalizado=False)):
+            with self.subTest(colunas=tuple(visao.columns[:2])):
+                with self.assertRaises(ValueError):
+                    visao.iloc[0, 0] = 0
+                with self.assertRaises(ValueError):
+                    visao.iloc[:2, -1] = visao.iloc[0, -1]
+
+        copia = instance.dataset(copia=True)
+        copia.iloc[0, 0] = 0
+        self.assertEqual(0, copia.iloc[0, 0])
+        self.assertNotEqual(0, instance.dataset().iloc[0, 0])
+
+    def test_clear_cache(self):
+        """Views must be discarded by `clear_cache`, after the data is changed in place."""
+        instance = self.iris_instance
+        x = instance.x(normalizado=False)
+
+        instance._dataset.iloc[0, 0] = -1
+        instance.clear_cache()
+
+        self.assertIsNot(x, instance.x(normalizado=False))
+        self.assertEqual(-1, instance.x(normalizado=False).iloc[0, 0])
+
     ################
     # Util methods #
     ################
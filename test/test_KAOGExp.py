@@ -1,14 +1,26 @@
+import pickle
+import tempfile
+import time
 import unittest
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
 from unittest import expectedFailure
 
+import numpy as np
 import pandas as pd
 from kaog import KAOG
 
 from kaogexp.data.loader import ColunaYSingleton
 from kaogexp.data.loader.DatasetFromMemory import DatasetFromMemory
+from kaogexp.data.sampler.EscalonadorGeometrico import EscalonadorGeometrico
 from kaogexp.data.sampler.LatinSampler import LatinSampler
+from kaogexp.explainer.ArmazenamentoExplicacoes import ArmazenamentoExplicacoes
+from kaogexp.explainer.ContextoExplicacao import ContextoExplicacao
 from kaogexp.explainer.KAOGExp import KAOGExp
+from kaogexp.explainer.PoliticaAmostras import PoliticaAmostras
+from kaogexp.metrics.carla_metrics import CARLADistances
 from kaogexp.explainer.methods.Counterfactual import Counterfactual
+from kaogexp.explainer.methods.CounterfactualResult import CounterfactualResult
 from kaogexp.model.RandomForestModel import RandomForestModel
 from util import Data
 
@@ -16,18 +28,37 @@ from util import Data
 class KAOGExpTest(unittest.TestCase):
     EPSILON = 0.05
     QTD_AMOSTRAS = 10
+    SEED = 7
 
     @classmethod
     def setUpClass(cls) -> None:
         ColunaYSingleton().NOME_COLUNA_Y = 'target'
 
+    @staticmethod
+    def criar_sampler(**kwargs) -> LatinSampler:
+        """Sampler with the vectorized generator, much faster than the default `lhsmdu`."""
+        return LatinSampler(KAOGExpTest.EPSILON, seed=KAOGExpTest.SEED, gerador=LatinSampler.GERADOR_VETORIZADO,
+                            **kwargs)
+
     def setUp(self) -> None:
         ColunaYSingleton().NOME_COLUNA_Y = 'target'
         self.adult = Data.create_new_instance_adult()
         model = RandomForestModel.from_dataset(self.adult)
-        sampler = LatinSampler(KAOGExpTest.EPSILON)
+        sampler = KAOGExpTest.criar_sampler()
         self.instance = KAOGExp(self.adult, model, sampler)
 
+        # Modelo e instâncias fixos, para que as explicações do iris sejam sempre as mesmas
+        self.iris = Data.create_new_instance_iris()
+        data = self.iris.dataset(encoded=False)
+        self.entradas_iris = data[data[ColunaYSingleton().NOME_COLUNA_Y] == 0].iloc[:4]
+        np.random.seed(KAOGExpTest.SEED)
+        self.modelo_iris = RandomForestModel(self.iris.x(), self.iris.y(), self.iris.tratador)
+
+    def criar_explicador_iris(self, sampler: Optional[LatinSampler] = None, **kwargs) -> KAOGExp:
+        """Explainer for the iris dataset with a fixed seed, so its searches always give the same results."""
+        sampler = sampler if sampler is not None else KAOGExpTest.criar_sampler()
+        return KAOGExp(self.iris, self.modelo_iris, sampler, seed=KAOGExpTest.SEED, **kwargs)
+
     def test_assert_instance_compatibility_dataframe(self):
         """Instance must be `pd.Series` or `pd.DataFrame` and with same columns as the `tratador`"""
         adult = Data.create_new_instance_adult()
@@ -72,6 +103,151 @@ class KAOGExpTest(unittest.TestCase):
         y = self.instance._classificar_amostragem(sample)
         self.assertEqual(sample.shape[0], sample.shape[0])
 
+    def test_classificar_lote(self):
+        """`_classificar_lote` must be equivalent to classifying each sample separately"""
+        instance = self.criar_explicador_iris()
+        amostragens = [instance.sampler.realizar_amostragem(row, KAOGExpTest.QTD_AMOSTRAS)
+                       for _, row in self.entradas_iris.iloc[:3].iterrows()]
+
+        result = instance._classificar_lote(amostragens)
+
+        self.assertEqual(len(amostragens), len(result))
+        for amostragem, y in zip(amostragens, result):
+            pd.testing.assert_series_equal(instance._classificar_amostragem(amostragem), y, check_dtype=False)
+
+    def test_contexto_bissecao(self):
+        """Epsilon must grow geometrically and then be refined back to the smallest valid value."""
+        sampler = KAOGExpTest.criar_sampler(escalonador=EscalonadorGeometrico(2., .025))
+        contexto = ContextoExplicacao(sampler, KAOGExp.NUM_SAMPLES)
+        epsilons = []
+
+        concluida = False
+        while not concluida:
+            epsilons.append(contexto.epsilon)
+            concluida = contexto.registrar_amostragem(contexto.epsilon >= .3)
+
+        # .05, .1, .2 e .4 no crescimento; .3, .25 e .275 na bisseção
+        self.assertEqual(7, len(epsilons))
+        self.assertAlmostEqual(.3, contexto.epsilon)
+
+    def test_contexto_bissecao_menos_rodadas(self):
+        """Far from the initial epsilon, the geometric schedule must need fewer samplings than the linear one."""
+        for limiar in (.5, .8, .95):
+            with self.subTest(limiar=limiar):
+                linear = self._rodadas_amostragem(KAOGExpTest.criar_sampler(), limiar)
+                geometrico = self._rodadas_amostragem(
+                    KAOGExpTest.criar_sampler(escalonador=EscalonadorGeometrico(2., .05)), limiar)
+
+                self.assertLess(geometrico[0], linear[0])
+                self.assertLessEqual(geometrico[1] - limiar, .05)
+
+    @staticmethod
+    def _rodadas_amostragem(sampler, limiar):
+        """Number of samplings until the search ends, when every epsilon from `limiar` on is valid, and the result."""
+        contexto = ContextoExplicacao(sampler, KAOGExp.NUM_SAMPLES)
+        rodadas = 1
+        while not contexto.registrar_amostragem(contexto.epsilon >= limiar - 1e-9):
+            rodadas += 1
+        return rodadas, contexto.epsilon
+
+    def test_obter_amostra_valida_escalonador(self):
+        """The sample found with an epsilon schedule must contain the desired class."""
+        sampler = KAOGExpTest.criar_sampler(escalonador=EscalonadorGeometrico())
+        instance = self.criar_explicador_iris(sampler)
+        contexto = ContextoExplicacao(sampler, KAOGExp.NUM_SAMPLES)
+
+        amostragem, y_amostragem = instance._obter_amostra_valida(1, self.entradas_iris.iloc[0], contexto)
+
+        self.assertTrue(y_amostragem.isin([1]).any())
+        self.assertEqual(KAOGExp.NUM_SAMPLES, amostragem.shape[0])
+
+    def test_contexto_politica_amostras(self):
+        """The amount of samples must grow on every invalid sampling, also while refining, up to the maximum."""
+        sampler = KAOGExpTest.criar_sampler(escalonador=EscalonadorGeometrico(2., .025))
+        contexto = ContextoExplicacao(sampler, KAOGExp.NUM_SAMPLES, PoliticaAmostras(inicial=10, maximo=150))
+
+        quantidades = []
+        concluida = False
+        while not concluida:
+            quantidades.append(contexto.num_amostras)
+            concluida = contexto.registrar_amostragem(contexto.epsilon >= .3)
+
+        # Inválidas em .05, .1 e .2 no crescimento e em .25 e .275 na bisseção
+        self.assertEqual([10, 20, 40, 80, 80, 80, 150], quantidades)
+        self.assertEqual(150, contexto.num_amostras)
+        # Without a policy, the amount is fixed
+        self.assertEqual(KAOGExp.NUM_SAMPLES, ContextoExplicacao(sampler, KAOGExp.NUM_SAMPLES).num_amostras)
+
+    def test_contexto_registrar_falha(self):
+        """The amount of samples must grow only on failures, not when epsilon is increased."""
+        contexto = ContextoExplicacao(KAOGExpTest.criar_sampler(), KAOGExp.NUM_SAMPLES,
+                                      PoliticaAmostras(inicial=10, maximo=30))
+
+        contexto.incrementar_epsilon()
+        self.assertEqual(10, contexto.num_amostras)
+        contexto.registrar_falha()
+        self.assertEqual(20, contexto.num_amostras)
+        self.assertAlmostEqual(KAOGExpTest.EPSILON * 2, contexto.epsilon)
+
+    def test_contexto_tempo_maximo(self):
+        """The time budget must count only the time of the explanation, not the time before its clock started."""
+        politica = PoliticaAmostras(inicial=10, maximo=40, tempo_maximo=.2)
+        contexto = ContextoExplicacao(KAOGExpTest.criar_sampler(), KAOGExp.NUM_SAMPLES, politica, iniciar=False)
+
+        # Trabalho de outras instâncias do lote, antes do início desta explicação
+        time.sleep(.3)
+        contexto.iniciar()
+        contexto.registrar_falha()
+        self.assertEqual(20, contexto.num_amostras)
+
+        # A parte da amostragem em lote atribuída à explicação consome o orçamento
+        contexto.adicionar_tempo(.3)
+        contexto.registrar_falha()
+        self.assertEqual(20, contexto.num_amostras)
+
+    def test_explicar_politica_amostras(self):
+        """Each sampling must use the amount of samples of the policy, growing after each failure."""
+        politica = PoliticaAmostras(inicial=10, maximo=40)
+        instance = self.criar_explicador_iris(politica_amostras=politica)
+        quantidades = []
+        realizar_amostragem = instance.sampler.realizar_amostragem
+        instance.sampler.realizar_amostragem = \
+            lambda instancia, num_amostras, *args: quantidades.append(num_amostras) or \
+            realizar_amostragem(instancia, num_amostras, *args)
+
+        result = instance.explicar(self.entradas_iris.iloc[0], Counterfactual, classe_desejada=1)
+
+        self.assertIsNotNone(result)
+        # A primeira amostragem, com o menor epsilon, não alcança a classe desejada
+        self.assertEqual([10, 20, 40], quantidades[:3])
+        self.assertTrue(all(quantidade == politica.maximo for quantidade in quantidades[3:]))
+        self.assertEqual(quantidades[-1], result.num_amostras)
+
+    def test_explicar_amostragem_incremental(self):
+        """After a failed search, previous samples must be kept and only the new ones classified."""
+
+        class CounterfactualFalhaUnica(Counterfactual):
+            tentativas = 0
+
+            def __init__(self, *args, **kwargs):
+                CounterfactualFalhaUnica.tentativas += 1
+                if CounterfactualFalhaUnica.tentativas == 1:
+                    raise RuntimeError('Falha forçada')
+                super().__init__(*args, **kwargs)
+
+        instance = self.criar_explicador_iris(amostragem_incremental=True)
+        classificadas = []
+        classificar_amostragem = instance._classificar_amostragem
+        instance._classificar_amostragem = lambda x: classificadas.append(x.shape[0]) or classificar_amostragem(x)
+
+        result = instance.explicar(self.entradas_iris.iloc[0], CounterfactualFalhaUnica, classe_desejada=1)
+
+        self.assertEqual(2, CounterfactualFalhaUnica.tentativas)
+        self.assertEqual(KAOGExp.NUM_SAMPLES, classificadas[-1])
+        self.assertIsNotNone(result)
+        self.assertEqual(2 * KAOGExp.NUM_SAMPLES, result.num_amostras)
+        self.assertTrue(result.kaog.y.index.is_unique)
+
     def test_criar_kaog(self):
         adult = Data.create_new_instance_adult()
         input_ = adult.dataset(encoded=False).sample(1).iloc[0]
@@ -88,6 +264,140 @@ class KAOGExpTest(unittest.TestCase):
         explicacao = self.instance.explicar(input_, metodo, classe_desejada=1)
         self.assertIsInstance(explicacao, metodo)
 
+    def test_explicar_dataframe(self):
+        """A `pd.DataFrame` must return one explanation for each row, in the same order."""
+        instance = self.criar_explicador_iris()
+
+        result = instance.explicar(self.entradas_iris.iloc[:3], Counterfactual, classe_desejada=1)
+
+        self.assertIsInstance(result, tuple)
+        self.assertEqual(3, len(result))
+        for (_, row), explicacao in zip(self.entradas_iris.iterrows(), result):
+            self.assertIsNotNone(explicacao)
+            pd.testing.assert_series_equal(row, explicacao.instancia_original)
+
+    def test_explicar_paralelo(self):
+        """`explicar_paralelo` must return one explanation for each row, in the same order."""
+        instance = self.criar_explicador_iris()
+
+        result = instance.explicar_paralelo(self.entradas_iris, Counterfactual, num_processos=2, tamanho_lote=1,
+                                            classe_desejada=1)
+
+        self.assertEqual(self.entradas_iris.shape[0], len(result))
+        for (_, row), explicacao in zip(self.entradas_iris.iterrows(), result):
+            self.assertIsNotNone(explicacao)
+            pd.testing.assert_series_equal(row, explicacao.instancia_original)
+
+    def test_explicar_iter(self):
+        """`explicar_iter` must yield each row index once, with its explanation, serially or out of order."""
+        instance = self.criar_explicador_iris()
+
+        for num_processos, ordenado in ((1, True), (2, False)):
+            with self.subTest(num_processos=num_processos, ordenado=ordenado):
+                result = list(instance.explicar_iter(self.entradas_iris, Counterfactual, num_processos=num_processos,
+                                                     tamanho_lote=1, ordenado=ordenado, classe_desejada=1))
+
+                self.assertCountEqual(self.entradas_iris.index, [index for index, _ in result])
+                for index, explicacao in result:
+                    self.assertIsNotNone(explicacao)
+                    pd.testing.assert_series_equal(self.entradas_iris.loc[index], explicacao.instancia_original)
+
+    def test_explicar_iter_serial_incremental(self):
+        """Serially, the first explanation must be yielded before the other instances are explained."""
+        data = self.iris.dataset(encoded=False)
+        input_ = data[data[ColunaYSingleton().NOME_COLUNA_Y] == 0].iloc[:8]
+        instance = self.criar_explicador_iris()
+        explicadas = []
+        explicar = instance._explicar
+        instance._explicar = lambda instancia, *args, **kwargs: explicadas.append(instancia.name) or \
+            explicar(instancia, *args, **kwargs)
+
+        result = instance.explicar_iter(input_, Counterfactual, classe_desejada=1)
+        index, explicacao = next(result)
+
+        self.assertEqual(input_.index[0], index)
+        self.assertIsNotNone(explicacao)
+        self.assertEqual([index], explicadas)
+        self.assertEqual(list(input_.index[1:]), [index for index, _ in result])
+        self.assertEqual(list(input_.index), explicadas)
+
+    def test_explicar_iter_armazenamento(self):
+        """`explicar_iter` must store each explanation and skip the rows already stored."""
+        input_ = self.entradas_iris
+        instance = self.criar_explicador_iris()
+
+        with tempfile.TemporaryDirectory() as diretorio:
+            with ArmazenamentoExplicacoes(diretorio, sincronizar=False) as armazenamento:
+                primeira = list(instance.explicar_iter(input_.iloc[:2], Counterfactual, armazenamento=armazenamento,
+                                                       classe_desejada=1))
+            with ArmazenamentoExplicacoes(diretorio, sincronizar=False) as armazenamento:
+                segunda = list(instance.explicar_iter(input_, Counterfactual, armazenamento=armazenamento,
+                                                      classe_desejada=1))
+                self.assertCountEqual(input_.index, armazenamento)
+
+        self.assertEqual(list(input_.index[:2]), [index for index, _ in primeira])
+        self.assertEqual(list(input_.index[2:]), [index for index, _ in segunda])
+
+    def test_explicar_reproduzivel(self):
+        """With the same seed, a parallel run must give exactly the same explanations as a serial one."""
+        instance = self.criar_explicador_iris()
+
+        serial = dict(instance.explicar_iter(self.entradas_iris, Counterfactual, classe_desejada=1))
+        paralelo = dict(instance.explicar_iter(self.entradas_iris.iloc[::-1], Counterfactual, num_processos=2,
+                                               tamanho_lote=1, ordenado=False, classe_desejada=1))
+
+        self.assertCountEqual(serial, paralelo)
+        for index, explicacao in serial.items():
+            self.assertIsNotNone(explicacao)
+            pd.testing.assert_series_equal(explicacao.instancia_modificada, paralelo[index].instancia_modificada)
+
+    def test_explicar_concorrente(self):
+        """The same explainer must serve concurrent explanations without changing the sampler epsilon."""
+        instance = self.criar_explicador_iris()
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            result = list(executor.map(lambda row: instance.explicar(row, Counterfactual, classe_desejada=1),
+                                       (row for _, row in self.entradas_iris.iterrows())))
+
+        self.assertEqual(KAOGExpTest.EPSILON, instance.sampler.epsilon)
+        for (_, row), explicacao in zip(self.entradas_iris.iterrows(), result):
+            self.assertIsNotNone(explicacao)
+            pd.testing.assert_series_equal(row, explicacao.instancia_original)
+
+    def test_explicar_resultado_compacto(self):
+        """A compact result must keep the rows and metadata of the explanation, but not the graph."""
+        input_ = self.entradas_iris.iloc[0]
+        instance = self.criar_explicador_iris(resultado_compacto=True)
+
+        result = instance.explicar(input_, Counterfactual, classe_desejada=1, tratador_associado=self.iris.tratador)
+
+        self.assertIsInstance(result, CounterfactualResult)
+        self.assertFalse(hasattr(result, 'kaog'))
+        self.assertFalse(hasattr(result, '__dict__'))
+        pd.testing.assert_series_equal(input_, result.instancia_original)
+        self.assertEqual(1, result.classe_desejada)
+        self.assertGreater(result.tempo, 0)
+        self.assertIsNotNone(CARLADistances.calcular(result))
+        copia = pickle.loads(pickle.dumps(result))
+        pd.testing.assert_series_equal(result.instancia_modificada, copia.instancia_modificada)
+
+    def test_explicar_lote_tempo_por_instancia(self):
+        """In a batch, the time of each result must not include the explanations of the previous rows."""
+        espera = .3
+
+        class CounterfactualLento(Counterfactual):
+            def __init__(self, *args, **kwargs):
+                time.sleep(espera)
+                super().__init__(*args, **kwargs)
+
+        instance = self.criar_explicador_iris(resultado_compacto=True)
+
+        result = instance.explicar(self.entradas_iris, CounterfactualLento, classe_desejada=1)
+
+        tempos = [explicacao.tempo for explicacao in result]
+        self.assertTrue(all(tempo >= espera for tempo in tempos))
+        self.assertLess(max(tempos) - min(tempos), espera)
+
     def test_explicar_dados_diferentes_iris(self):
         """
         Dada uma instância nunca vista (com dados categóricos já conhecidos), deve ser dada uma explicação válida.
@@ -102,7 +412,7 @@ class KAOGExpTest(unittest.TestCase):
         train_data = data.drop(input_index)
 
         modelo = RandomForestModel(iris.x().drop(input_index), iris.y().drop(input_index), iris.tratador)
-        sampler = LatinSampler(KAOGExpTest.EPSILON)
+        sampler = KAOGExpTest.criar_sampler()
         instance = KAOGExp(DatasetFromMemory(train_data, pd.Index([])), modelo, sampler)
 
         result = instance.explicar(input_, metodo, classe_desejada=classe_desejada,
@@ -128,7 +438,7 @@ class KAOGExpTest(unittest.TestCase):
         train_data = data.drop(input_index)
 
         modelo = RandomForestModel(adult.x(encoded=True).drop(input_index), adult.y().drop(input_index), adult.tratador)
-        sampler = LatinSampler(KAOGExpTest.EPSILON)
+        sampler = KAOGExpTest.criar_sampler()
         instance = KAOGExp(DatasetFromMemory(train_data, adult._nomes_colunas_categoricas), modelo, sampler)
 
         result = instance.explicar(input_, metodo, classe_desejada=classe_desejada,
@@ -149,7 +459,7 @@ class KAOGExpTest(unittest.TestCase):
         train_data = data.drop(input_index)
         fixed_cols = pd.Index(['age', 'sex', 'hours-per-week'])
         modelo = RandomForestModel(adult.x(encoded=True).drop(input_index), adult.y().drop(input_index), adult.tratador)
-        sampler = LatinSampler(KAOGExpTest.EPSILON)
+        sampler = KAOGExpTest.criar_sampler()
         instance = KAOGExp(DatasetFromMemory(train_data, adult._nomes_colunas_categoricas), modelo, sampler,
                            fixed_cols=fixed_cols)
 
@@ -1,14 +1,18 @@
 import random
 import unittest
+import warnings
+from concurrent.futures import ThreadPoolExecutor
 from copy import deepcopy
 from functools import partial
 from typing import Union
 from unittest import expectedFailure
 
+import lhsmdu
 import numpy as np
 import pandas as pd
 
 from kaogexp.data.loader import ColunaYSingleton
+from kaogexp.data.sampler.EscalonadorGeometrico import EscalonadorGeometrico
 from kaogexp.data.sampler.LatinSampler import LatinSampler
 from util import Data
 
@@ -86,6 +90,149 @@ class LatinSamplerTest(unittest.TestCase):
                 self.assertTrue(is_inside_space(sample).all(), "Sample is not inside the space")
                 self.assertNotIn('object', sample.dtypes)
 
+    def test_realizar_amostragem_epsilon(self):
+        # Epsilon given as argument must be used without changing the sampler state
+        input_ = pd.Series(np.array([.5, .5]))
+        epsilon = .2
+        sample = self.instance.realizar_amostragem(input_, 10, epsilon)
+
+        self.assertTrue(self.is_inside_space(sample, epsilon, input_), "Sample is not inside the space")
+        self.assertFalse(self.is_inside_space(sample, self.EPSILON, input_), "Sample did not use the given epsilon")
+        self.assertEqual(self.EPSILON, self.instance.epsilon)
+
+    def test_proximo_epsilon(self):
+        instance = LatinSampler(self.EPSILON, seed=self.SEED)
+
+        result = instance.proximo_epsilon(instance.epsilon)
+
+        self.assertAlmostEqual(self.EPSILON + instance.incremento, result)
+        self.assertEqual(self.EPSILON, instance.epsilon)
+        with self.assertRaises(ValueError):
+            instance.proximo_epsilon(1.)
+
+    def test_escalonador_geometrico(self):
+        instance = LatinSampler(self.EPSILON, seed=self.SEED, escalonador=EscalonadorGeometrico(2., .01))
+
+        self.assertAlmostEqual(self.EPSILON * 2, instance.proximo_epsilon(self.EPSILON))
+        self.assertAlmostEqual(1., instance.proximo_epsilon(.8))
+        with self.assertRaises(ValueError):
+            instance.proximo_epsilon(1.)
+        np.testing.assert_array_almost_equal(np.array([0, .1]), instance.proximo_epsilon(np.array([0, .05])))
+        self.assertAlmostEqual(.3, instance.refinar_epsilon(.2, .4))
+        self.assertIsNone(instance.refinar_epsilon(.2, .205))
+        # Without a schedule, epsilon is never refined
+        self.assertIsNone(self.instance.refinar_epsilon(.2, .4))
+
+    def test_escalonador_geometrico_epsilon_zero(self):
+        # A zero epsilon must grow to the minimum epsilon, and then geometrically
+        instance = LatinSampler(0., seed=self.SEED, escalonador=EscalonadorGeometrico(2., .01, epsilon_minimo=.02))
+
+        self.assertAlmostEqual(.02, instance.proximo_epsilon(0.))
+        self.assertAlmostEqual(.04, instance.proximo_epsilon(.02))
+        with self.assertRaises(ValueError):
+            EscalonadorGeometrico(epsilon_minimo=0.)
+
+    def test_latin_hypercube_stratified(self):
+        # Each feature must have exactly one sample in each stratum
+        num_samples, dim = 20, 4
+        for gerador in LatinSampler.GERADORES:
+            with self.subTest("Latin_hypercube_stratified subtest", gerador=gerador):
+                instance = LatinSampler(self.EPSILON, seed=self.SEED, gerador=gerador)
+                design = instance._latin_hypercube(dim, num_samples)
+
+                self.assertEqual((num_samples, dim), design.shape)
+                strata = np.sort(np.floor(design * num_samples), axis=0)
+                np.testing.assert_array_equal(np.tile(np.arange(num_samples), (dim, 1)).T, strata)
+
+    def test_latin_hypercube_reproducible(self):
+        # Samplers with the same seed must generate the same sequence of samples
+        input_ = pd.Series(np.array([.5, .5, .5]))
+        for gerador in LatinSampler.GERADORES:
+            with self.subTest("Latin_hypercube_reproducible subtest", gerador=gerador):
+                # lhsmdu keeps a single stream, reseeded when each sampler is created, so they are used one at a time
+                instance1 = LatinSampler(self.EPSILON, seed=self.SEED, gerador=gerador)
+                amostras1 = [instance1.realizar_amostragem(input_, 10) for _ in range(2)]
+                instance2 = LatinSampler(self.EPSILON, seed=self.SEED, gerador=gerador)
+                amostras2 = [instance2.realizar_amostragem(input_, 10) for _ in range(2)]
+
+                for amostra1, amostra2 in zip(amostras1, amostras2):
+                    pd.testing.assert_frame_equal(amostra1, amostra2)
+
+        # The vectorized generator keeps its stream in the sampler, so samplers can also be used alternately
+        instance1 = LatinSampler(self.EPSILON, seed=self.SEED, gerador=LatinSampler.GERADOR_VETORIZADO)
+        instance2 = LatinSampler(self.EPSILON, seed=self.SEED, gerador=LatinSampler.GERADOR_VETORIZADO)
+        for _ in range(2):
+            pd.testing.assert_frame_equal(instance1.realizar_amostragem(input_, 10),
+                                          instance2.realizar_amostragem(input_, 10))
+
+    def test_lhsmdu_sem_gerador(self):
+        # Without a generator, lhsmdu must give the same hypercubes as earlier versions, continuing the stream seeded
+        # when the sampler is created
+        lhsmdu.setRandomSeed(self.SEED)
+        with warnings.catch_warnings():
+            warnings.filterwarnings('ignore', category=PendingDeprecationWarning)
+            esperado = [np.array(lhsmdu.sample(3, 10, randomSeed=self.SEED)).T for _ in range(2)]
+
+        instance = LatinSampler(self.EPSILON, seed=self.SEED, gerador=LatinSampler.GERADOR_LHSMDU)
+
+        for design in esperado:
+            np.testing.assert_array_equal(design, instance._latin_hypercube(3, 10))
+
+    def test_lhsmdu_concorrente(self):
+        # lhsmdu keeps global state, so concurrent calls must give the same hypercubes as serial ones
+        instance = LatinSampler(self.EPSILON, seed=self.SEED, gerador=LatinSampler.GERADOR_LHSMDU)
+        gerar = lambda seed: instance._latin_hypercube(3, 10, np.random.default_rng(seed))
+        serial = [gerar(seed) for seed in range(8)]
+        # Seeds already used must still reseed lhsmdu, even after other draws from `numpy.random`
+        np.random.random()
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            concorrente = list(executor.map(gerar, range(8)))
+
+        for esperado, resultado in zip(serial, concorrente):
+            np.testing.assert_array_equal(esperado, resultado)
+
+    def test_maximin(self):
+        # The refinement must keep the Latin hypercube and not reduce the minimum distance
+        num_samples, dim = 30, 3
+        rng = np.random.default_rng(self.SEED)
+        design = LatinSampler._stratified_design(rng, dim, num_samples)
+
+        result = LatinSampler._maximin(rng, design, 200)
+
+        np.testing.assert_array_equal(np.sort(design, axis=0), np.sort(result, axis=0))
+        self.assertGreaterEqual(self.min_distance(result), self.min_distance(design))
+
+    def test_cache(self):
+        # Only the first sampling of each shape generates a hypercube, the others only rescale it
+        input_ = pd.Series(np.array([.5, .5]))
+        instance = LatinSampler(self.EPSILON, seed=self.SEED, gerador=LatinSampler.GERADOR_VETORIZADO, tamanho_cache=1)
+
+        sample1 = instance.realizar_amostragem(input_, 10)
+        sample2 = instance.realizar_amostragem(input_, 10, self.EPSILON * 2)
+
+        self.assertEqual(1, instance.cache_misses)
+        self.assertEqual(1, instance.cache_hits)
+        pd.testing.assert_frame_equal((sample1 - .5) * 2, sample2 - .5)
+
+        # A new shape replaces the oldest hypercube
+        instance.realizar_amostragem(pd.Series(np.array([.5, .5, .5])), 10)
+        instance.realizar_amostragem(input_, 10)
+        self.assertEqual(3, instance.cache_misses)
+        self.assertEqual(1, len(instance._cache))
+
+        instance.clear_cache()
+        self.assertEqual(0, instance.cache_hits)
+        self.assertEqual(0, len(instance._cache))
+
+    def test_gerador_padrao(self):
+        # The default generator must stay `lhsmdu`, so existing runs keep the same hypercubes
+        self.assertEqual(LatinSampler.GERADOR_LHSMDU, LatinSampler(self.EPSILON, seed=self.SEED).gerador)
+
+    def test_gerador_invalido(self):
+        with self.assertRaises(ValueError):
+            LatinSampler(self.EPSILON, seed=self.SEED, gerador='invalido')
+
     @expectedFailure
     def test_amostragem_diferentes(self):
         input_ = pd.Series(np.array([0, 0]))
@@ -169,6 +316,12 @@ class LatinSamplerTest(unittest.TestCase):
         sup = interest_point + epsilon
         return (inf <= x.min()).all() and (x.max() <= sup).all()
 
+    @staticmethod
+    def min_distance(design: np.ndarray) -> float:
+        distances = np.sqrt(((design[:, np.newaxis, :] - design[np.newaxis, :, :]) ** 2).sum(axis=2))
+        np.fill_diagonal(distances, np.inf)
+        return distances.min()
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -1,6 +1,8 @@
 import unittest
 
+import numpy as np
 import pandas as pd
+from sklearn.preprocessing import MinMaxScaler
 
 from kaogexp.data.loader import ColunaYSingleton
 from kaogexp.data.normalizer.MinMaxNormalizer import MinMaxNormalizer
@@ -77,6 +79,31 @@ class MinMaxNormalizerTest(unittest.TestCase):
         pd.testing.assert_frame_equal(reversed_, sample, check_dtype=False)
         self.assertIsInstance(reversed_, pd.DataFrame)
 
+    def test_transform_same_as_sklearn(self):
+        """The NumPy path must match `MinMaxScaler`, for single rows and batches."""
+        instance = self.create()
+        scaler = MinMaxScaler().fit(self.data_adult[self.numeric_columns_adult])
+        sample = self.data_adult.sample(10)
+        expected = scaler.transform(sample[self.numeric_columns_adult])
+
+        transformed = instance.transform(sample)
+        np.testing.assert_allclose(expected, transformed[self.numeric_columns_adult].to_numpy(dtype=float))
+        for i, (_, row) in enumerate(sample.iterrows()):
+            transformed_row = instance.transform(row)
+            np.testing.assert_allclose(expected[i], transformed_row[self.numeric_columns_adult].to_numpy(dtype=float))
+            pd.testing.assert_series_equal(row, instance.inverse_transform(transformed_row), check_dtype=False)
+
+    def test_independent_instances(self):
+        """Creating another normalizer must not change the parameters of an existing one."""
+        instance = self.create()
+        sample = self.data_adult.sample(5)
+        expected = instance.transform(sample)
+
+        MinMaxNormalizer(sample[self.numeric_columns_adult] * 10, pd.Index(self.numeric_columns_adult))
+
+        pd.testing.assert_frame_equal(expected, instance.transform(sample))
+        self.assertRaises(ValueError, instance.escala.__setitem__, 0, 1.)
+
     ################
     # Util methods #
     ################
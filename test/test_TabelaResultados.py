@@ -0,0 +1,106 @@
+import json
+import os
+import tempfile
+from unittest import TestCase
+
+import numpy as np
+
+from kaogexp.data.loader import ColunaYSingleton
+from kaogexp.explainer.TabelaResultados import TabelaResultados
+from kaogexp.explainer.methods.CounterfactualResult import CounterfactualResult
+from kaogexp.metrics.carla_metrics import CARLADistances
+from kaogexp.metrics.dispersao import Dispersao
+from kaogexp.metrics.validity import Validity
+from main.carla_runs.util import compute_and_save_metrics, compute_and_save_table_metrics
+from util import Data
+
+
+class TestTabelaResultados(TestCase):
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        ColunaYSingleton().NOME_COLUNA_Y = 'target'
+
+    def setUp(self) -> None:
+        self.diretorio = tempfile.TemporaryDirectory()
+        self.addCleanup(self.diretorio.cleanup)
+        adult = Data.create_new_instance_adult(num_sample=50)
+        self.adult = adult
+        self.tratador = adult.tratador
+        data = adult.dataset(encoded=False)
+        nome_y = ColunaYSingleton().NOME_COLUNA_Y
+        outra_categoria = data['workclass'].cat.categories[0]
+
+        self.explicacoes = []
+        for i, (index, original) in enumerate(data.iloc[:4].iterrows()):
+            modificada = original.copy()
+            modificada['age'] += i
+            if i % 2:
+                modificada['workclass'] = outra_categoria
+                modificada[nome_y] = 1 - original[nome_y]
+            self.explicacoes.append((index, CounterfactualResult(original, modificada, 1, .5, 1., self.tratador,
+                                                                 num_amostras=20 * i, tempo=.1 * i, epsilon=.05)))
+        self.explicacoes.append((data.index[4], None))
+
+    def test_metricas(self):
+        """Vectorized metrics must match the metrics computed for each explanation."""
+        tabela = TabelaResultados.escrever(self.diretorio.name, self.explicacoes, self.tratador)
+
+        self.assertEqual(len(self.explicacoes), len(tabela))
+        np.testing.assert_array_equal([index for index, _ in self.explicacoes], tabela.index)
+        np.testing.assert_array_equal([True] * 4 + [False], tabela.encontrado)
+        np.testing.assert_array_equal([0, 20, 40, 60, -1], tabela.num_amostras)
+        np.testing.assert_array_equal([Validity.calcular(explicacao) for _, explicacao in self.explicacoes],
+                                      tabela.validade())
+        np.testing.assert_array_equal([Dispersao.calcular(explicacao) for _, explicacao in self.explicacoes[:4]],
+                                      tabela.dispersao()[:4])
+        self.assertTrue(np.isnan(tabela.dispersao()[4]))
+
+        distancias = tabela.distancias_carla()
+        for i, (_, explicacao) in enumerate(self.explicacoes[:4]):
+            for distancia, valor in CARLADistances.calcular(explicacao).items():
+                self.assertAlmostEqual(valor, distancias[distancia][i])
+        self.assertTrue(np.isnan(distancias['Distance_1'][4]))
+
+    def test_leitura_mmap(self):
+        """Reopened tables must be memory-mapped and keep the stored values."""
+        TabelaResultados.escrever(self.diretorio.name, self.explicacoes, self.tratador)
+
+        tabela = TabelaResultados(self.diretorio.name)
+
+        self.assertIsInstance(tabela.original, np.memmap)
+        np.testing.assert_allclose([0, .1, .2, .3], tabela.tempo[:4])
+        np.testing.assert_allclose(.05, tabela.epsilon[:4])
+        self.assertEqual(list(tabela.colunas[:-1]), list(self.tratador.nomes_colunas_encoded.drop('target')))
+
+    def test_metricas_json(self):
+        """Metrics saved from the table must be the same as the ones saved from the explanations."""
+        tabela = TabelaResultados.escrever(self.diretorio.name, self.explicacoes, self.tratador)
+        explicacoes = [explicacao for _, explicacao in self.explicacoes]
+
+        compute_and_save_metrics('pickle', self.diretorio.name, self.adult.dataset(normalizado=False),
+                                 self.adult, explicacoes)
+        compute_and_save_table_metrics('tabela', self.diretorio.name, tabela)
+
+        esperado, resultado = (self._ler_metricas(f'metricas_{nome}.json') for nome in ('pickle', 'tabela'))
+        for metrica in ('validade', 'cerscore', 'proximidade'):
+            with self.subTest(metrica=metrica):
+                self._assert_mesmos_valores(esperado[metrica], resultado[metrica])
+
+    def _ler_metricas(self, arquivo):
+        with open(os.path.join(self.diretorio.name, arquivo)) as file:
+            return json.load(file)
+
+    def _assert_mesmos_valores(self, esperado, resultado):
+        if isinstance(esperado, dict):
+            self.assertEqual(esperado.keys(), resultado.keys())
+            for chave in esperado:
+                self._assert_mesmos_valores(esperado[chave], resultado[chave])
+        elif isinstance(esperado, list):
+            self.assertEqual(len(esperado), len(resultado))
+            for valor_esperado, valor in zip(esperado, resultado):
+                self._assert_mesmos_valores(valor_esperado, valor)
+        elif esperado is None:
+            self.assertIsNone(resultado)
+        else:
+            self.assertAlmostEqual(esperado, resultado)
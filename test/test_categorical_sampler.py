@@ -1,6 +1,8 @@
 from random import choice
 from unittest import TestCase
+from unittest.mock import patch
 
+import numpy as np
 import pandas as pd
 
 from kaogexp.data.loader import ColunaYSingleton
@@ -43,7 +45,7 @@ class TestRandomCategoricalSampler(TestCase):
         }
 
         instance = RandomCategoricalSampler(self.data, cat_cols, fixed_cols)
-        result = instance._obter_valores_cat_unicos()
+        result = instance._obter_valores_cat_unicos(self.data)
 
         print(result)
         self.assertDictEqual(expected, result)
@@ -70,3 +72,29 @@ class TestRandomCategoricalSampler(TestCase):
         print(result)
         self.assertFalse(result.equals(amostra))
         pd.testing.assert_frame_equal(amostra[fixed_cols], result[fixed_cols])
+
+    def test_realizar_amostragem_todos_alterados(self):
+        """Every mutable categorical cell must change, and the same seed must give the same sample."""
+        cat_cols = pd.Index(['a', 'b', 'c'])
+        fixed_cols = pd.Index(['c'])
+        amostra = pd.concat([self.data] * 20, ignore_index=True)
+        amostra.loc[0, 'a'] = 4  # Valor desconhecido
+        instance = RandomCategoricalSampler(self.data, cat_cols, fixed_cols)
+
+        result = instance.realizar_amostragem(amostra, np.random.default_rng(0))
+
+        self.assertTrue((result[['a', 'b']].iloc[1:] != amostra[['a', 'b']].iloc[1:]).all().all())
+        self.assertTrue(result['a'].isin(instance.unique_cat_cols['a']).all())
+        pd.testing.assert_frame_equal(amostra[['c', 'd']], result[['c', 'd']])
+        pd.testing.assert_frame_equal(result, instance.realizar_amostragem(amostra, np.random.default_rng(0)))
+
+    def test_sem_copia_dos_dados(self):
+        """The sampler must keep only the unique values of the changed columns, without copying the data."""
+        cat_cols = pd.Index(['a', 'b'])
+
+        with patch.object(pd.DataFrame, 'copy', autospec=True, side_effect=pd.DataFrame.copy) as copia:
+            instance = RandomCategoricalSampler(self.data, cat_cols)
+
+        copia.assert_not_called()
+        self.assertFalse(hasattr(instance, 'data'))
+        self.assertEqual({'a': [1, 2, 3, 5], 'b': ['m', 'f']}, instance.unique_cat_cols)
@@ -1,7 +1,9 @@
 from math import sqrt
 from unittest import TestCase, mock
 
+import numpy as np
 import pandas as pd
+from sklearn.neighbors import NearestNeighbors
 
 from kaogexp.data.loader import ColunaYSingleton
 from kaogexp.explainer.kaog.custom_kaog import NovaDistancia
@@ -33,3 +35,14 @@ class TestDistancias_(TestCase):
         self.assertTrue((result.columns == colunas_encoded_drop).all())
         self.assertFalse((result[colunas_encoded] == 1).any().any())
         self.assertTrue((result[colunas_encoded] == sqrt(.5)).any().any())
+
+    def test_vizinhos_denso(self):
+        """The dense engine must find the same neighbours as the ball tree."""
+        x = np.random.default_rng(42).random((50, 6))
+
+        distancias, vizinhos = NovaDistancia._vizinhos_denso(x)
+        nn = NearestNeighbors(n_neighbors=x.shape[0], algorithm='ball_tree').fit(x)
+        distancias_nn, vizinhos_nn = nn.kneighbors(n_neighbors=x.shape[0] - 1)
+
+        np.testing.assert_array_almost_equal(distancias_nn, distancias)
+        np.testing.assert_array_equal(vizinhos_nn, vizinhos)
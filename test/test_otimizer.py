@@ -5,10 +5,9 @@ import pandas as pd
 
 from kaogexp.data.loader import ColunaYSingleton
 from kaogexp.data.loader.DatasetFromMemory import DatasetFromMemory
-from kaogexp.data.sampler.LatinSampler import LatinSampler
 from kaogexp.explainer.KAOGExp import KAOGExp
 from kaogexp.explainer.methods.Counterfactual import Counterfactual
-from kaogexp.explainer.otimizer import SparsityOptimization
+from kaogexp.explainer.otimizer import SparsityOptimization, GreedySparsityOptimization, BeamSparsityOptimization
 from kaogexp.model.RandomForestModel import RandomForestModel
 from test_KAOGExp import KAOGExpTest
 from util import Data
@@ -29,7 +28,7 @@ class TestSparsityOptimization(TestCase):
         train_data = data.drop(input_index)
         fixed_cols = pd.Index(['age', 'sex', 'hours-per-week'])
         modelo = RandomForestModel(adult.x(encoded=True).drop(input_index), adult.y().drop(input_index), adult.tratador)
-        sampler = LatinSampler(KAOGExpTest.EPSILON)
+        sampler = KAOGExpTest.criar_sampler()
         kaogexp = KAOGExp(DatasetFromMemory(train_data, adult._nomes_colunas_categoricas), modelo, sampler,
                           fixed_cols=fixed_cols)
 
@@ -63,3 +62,97 @@ class TestSparsityOptimization(TestCase):
         print(resultado)
         self.assertEqual((2 ** num_diff) - 2, len(resultado))
         self.assertTrue((resultado['a'] == 1).all())
+
+    def test_optimize_por_nivel(self):
+        """Each level must be predicted in a single call, stopping at the first level with a valid candidate."""
+        counterfactual, modelo = self._counterfactual_e_modelo()
+
+        resultado = SparsityOptimization(modelo, pd.Index([])).optimize(counterfactual)
+
+        self.assertEqual(1, modelo.predict.call_count)
+        self.assertEqual([1, 2, 3, 7, 1], resultado.instancia_modificada.tolist())
+
+    def test_optimize_guloso(self):
+        """Greedy elimination must revert one feature per model call while the desired class is kept."""
+        counterfactual, modelo = self._counterfactual_e_modelo()
+
+        resultado = GreedySparsityOptimization(modelo, pd.Index([])).optimize(counterfactual)
+
+        self.assertEqual(2, modelo.predict.call_count)
+        self.assertEqual([1, 2, 3, 7, 1], resultado.instancia_modificada.tolist())
+
+    def test_optimize_feixe_orcamento(self):
+        """Beam search must respect the budget of model calls."""
+        counterfactual, modelo = self._counterfactual_e_modelo()
+
+        resultado = BeamSparsityOptimization(modelo, pd.Index([]), largura=2, max_chamadas=1).optimize(counterfactual)
+
+        self.assertEqual(1, modelo.predict.call_count)
+        self.assertEqual([1, 2, 6, 7, 1], resultado.instancia_modificada.tolist())
+        # A instância recebida não deve ser alterada
+        self.assertEqual([1, 5, 6, 7, 1], counterfactual.instancia_modificada.tolist())
+
+    def test_optimize_feixe_ordenado(self):
+        """The beam must keep the valid states closest to the original, finding a result as sparse as greedy or more."""
+        original = pd.Series([1, 2, 3, 4, 0], index=['a', 'b', 'c', 'd', ColunaYSingleton().NOME_COLUNA_Y])
+        modificada = pd.Series([1, 5, 7, 14, 1], index=['a', 'b', 'c', 'd', ColunaYSingleton().NOME_COLUNA_Y])
+        counterfactual, modelo = self._counterfactual_e_modelo(original, modificada)
+        # Reverter `d`, a feature mais distante, mantém a classe, mas impede que `b` e `c` sejam revertidas
+        modelo.predict.side_effect = lambda x: ((x['d'] != 4) | ((x['b'] != 2) & (x['c'] != 3))).astype(int) \
+            .to_numpy()
+
+        guloso = GreedySparsityOptimization(modelo, pd.Index([])).optimize(counterfactual)
+        feixe = BeamSparsityOptimization(modelo, pd.Index([]), largura=2).optimize(counterfactual)
+
+        self.assertEqual([1, 5, 7, 4, 1], guloso.instancia_modificada.tolist())
+        self.assertEqual([1, 2, 3, 14, 1], feixe.instancia_modificada.tolist())
+        self.assertLessEqual((feixe.instancia_modificada != original).sum(),
+                             (guloso.instancia_modificada != original).sum())
+
+    def test__custos(self):
+        """Numeric features cost the squared difference, the others 1, and unexpected errors must not be hidden."""
+        original = pd.Series([1., 'a', 'x', 4.], index=['a', 'b', 'c', 'd'])
+        modificada = pd.Series([3., 'b', 'y', 4.5], index=['a', 'b', 'c', 'd'])
+        instance = BeamSparsityOptimization(None, pd.Index(['b']))
+
+        custos = instance._custos(original, modificada, pd.Index(['a', 'b', 'c', 'd']))
+
+        self.assertEqual([4., 1., 1., .25], custos.tolist())
+        modificada['a'] = 1j
+        with self.assertRaises(TypeError):
+            instance._custos(original, modificada, pd.Index(['a']))
+
+    def test_optimize_sem_copiar_kaog(self):
+        """The optimized result must share the graph with the input instead of copying it."""
+        counterfactual, modelo = self._counterfactual_e_modelo()
+        counterfactual.kaog = Mock()
+
+        resultado = SparsityOptimization(modelo, pd.Index([])).optimize(counterfactual)
+
+        self.assertIsNot(counterfactual, resultado)
+        self.assertIs(counterfactual.kaog, resultado.kaog)
+        self.assertEqual([1, 5, 6, 7, 1], counterfactual.instancia_modificada.tolist())
+
+    def test_kaogexp_otimizador(self):
+        """`KAOGExp` must use the optimizer passed in `otimizar`."""
+        iris = Data.create_new_instance_iris()
+        modelo = RandomForestModel(iris.x(), iris.y(), iris.tratador)
+        otimizador = GreedySparsityOptimization(modelo, iris.nomes_colunas_categoricas)
+
+        self.assertIs(otimizador, KAOGExp(iris, modelo, KAOGExpTest.criar_sampler(), otimizar=otimizador)._otimizador)
+        self.assertIsNone(KAOGExp(iris, modelo, KAOGExpTest.criar_sampler(), otimizar=False)._otimizador)
+
+    @staticmethod
+    def _counterfactual_e_modelo(original=None, modificada=None):
+        """Counterfactual with 3 changed features, valid only while `b` is reverted, and a mocked model."""
+        if original is None:
+            original = pd.Series([1, 2, 3, 4, 0], index=['a', 'b', 'c', 'd', ColunaYSingleton().NOME_COLUNA_Y])
+        if modificada is None:
+            modificada = pd.Series([1, 5, 6, 7, 1], index=['a', 'b', 'c', 'd', ColunaYSingleton().NOME_COLUNA_Y])
+        counterfactual = Counterfactual.__new__(Counterfactual)
+        counterfactual._instancia_original = original
+        counterfactual._instancia_modificada = modificada
+        counterfactual._classe_desejada = 1
+        modelo = Mock()
+        modelo.predict.side_effect = lambda x: (x['b'] == 2).astype(int).to_numpy()
+        return counterfactual, modelo